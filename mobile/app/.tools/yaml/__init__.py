@@ -6,7 +6,10 @@ from .events import *
 from .nodes import *
 
 from .loader import *
+from .loader import loader_class
 from .dumper import *
+from .incremental import *
+from .query import *
 
 __version__ = '6.0.2'
 try:
@@ -48,23 +51,29 @@ def parse(stream, Loader=Loader):
     finally:
         loader.dispose()
 
-def compose(stream, Loader=Loader):
+def compose(stream, Loader=Loader, share_subtrees=False):
     """
     Parse the first YAML document in a stream
     and produce the corresponding representation tree.
+
+    If `share_subtrees` is true, equal subtrees are
+    replaced by the first of them.
     """
-    loader = Loader(stream)
+    loader = loader_class(Loader, share_subtrees=share_subtrees)(stream)
     try:
         return loader.get_single_node()
     finally:
         loader.dispose()
 
-def compose_all(stream, Loader=Loader):
+def compose_all(stream, Loader=Loader, share_subtrees=False):
     """
     Parse all YAML documents in a stream
     and produce corresponding representation trees.
+
+    If `share_subtrees` is true, equal subtrees are
+    replaced by the first of them in each document.
     """
-    loader = Loader(stream)
+    loader = loader_class(Loader, share_subtrees=share_subtrees)(stream)
     try:
         while loader.check_node():
             yield loader.get_node()
@@ -94,6 +103,36 @@ def load_all(stream, Loader):
     finally:
         loader.dispose()
 
+async def aparse(stream):
+    """
+    Parse a YAML stream read with `await stream.read(size)`
+    and produce parsing events as soon as they are decided.
+    """
+    parser = IncrementalParser()
+    while not parser.eof:
+        data = await stream.read(65536)
+        if data:
+            parser.feed(data)
+        else:
+            parser.close()
+        for event in parser.events():
+            yield event
+
+async def aload_all(stream, Loader=SafeLoader):
+    """
+    Parse all YAML documents in a stream read with
+    `await stream.read(size)` and produce corresponding
+    Python objects as soon as each document is complete.
+    """
+    loader = EventQueue.loader_class(Loader)()
+    try:
+        async for event in aparse(stream):
+            loader.queued_events.append(event)
+            if isinstance(event, DocumentEndEvent) and loader.check_data():
+                yield loader.get_data()
+    finally:
+        loader.dispose()
+
 def full_load(stream):
     """
     Parse the first YAML document in a stream
@@ -114,24 +153,47 @@ def full_load_all(stream):
     """
     return load_all(stream, FullLoader)
 
-def safe_load(stream):
+def safe_load(stream, include=None, exclude=None,
+        intern_keys=False, intern_scalars=None, share_subtrees=False):
     """
     Parse the first YAML document in a stream
     and produce the corresponding Python object.
 
     Resolve only basic YAML tags. This is known
     to be safe for untrusted input.
+
+    If `include` or `exclude` is given, only the parts of
+    the document matching the `include` paths and not
+    matching the `exclude` paths are constructed; the paths
+    are as in `iter_path`.
+
+    If `intern_keys` is true, equal string keys are made
+    the same object; if `intern_scalars` is a length, so
+    are equal string scalars up to that length.
+
+    If `share_subtrees` is true, equal subtrees are
+    constructed once and are the same object.
     """
-    return load(stream, SafeLoader)
+    Loader = loader_class(SafeLoader, intern_keys=intern_keys,
+            intern_scalars=intern_scalars, share_subtrees=share_subtrees)
+    if include is not None or exclude is not None:
+        return load_projection(stream, Loader, include, exclude)
+    return load(stream, Loader)
 
-def safe_load_all(stream):
+def safe_load_all(stream, workers=None):
     """
     Parse all YAML documents in a stream
     and produce corresponding Python objects.
 
     Resolve only basic YAML tags. This is known
     to be safe for untrusted input.
+
+    If `workers` is greater than 1, the documents are
+    loaded in that many processes and produced in order.
     """
+    if workers is not None and workers > 1:
+        from .parallel import parallel_load_all
+        return parallel_load_all(stream, SafeLoader, workers)
     return load_all(stream, SafeLoader)
 
 def unsafe_load(stream):
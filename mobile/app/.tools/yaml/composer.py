@@ -5,13 +5,37 @@ from .error import MarkedYAMLError
 from .events import *
 from .nodes import *
 
+import collections
+
 class ComposerError(MarkedYAMLError):
     pass
 
+ShareInfo = collections.namedtuple('ShareInfo', 'subtrees shared nodes')
+
 class Composer:
 
+    # With `share_subtrees` set, a node that is equal to one composed
+    # earlier in the document, with the same tags, values, styles and
+    # children, is replaced by the earlier one. Since the children are
+    # replaced first, the nodes are compared by the identities of their
+    # children. The constructor constructs a shared node once, as it does
+    # an aliased node, so the objects are shared as well: equal subtrees
+    # are the same object, and a change to one shows in all of them. A
+    # shared node keeps the marks of its first occurrence. Anchored nodes
+    # are not replaced, and documents are not constructed directly from the
+    # events in this mode. Merge and value keys and the mappings with them
+    # are not shared either, as `flatten_mapping` changes them in place.
+    share_subtrees = False
+
+    # The tags of the keys that `flatten_mapping` removes or retags.
+    UNSHARED_TAGS = {'tag:yaml.org,2002:merge', 'tag:yaml.org,2002:value'}
+
     def __init__(self):
         self.anchors = {}
+        self.shared_nodes = {}
+        self.shared_subtrees = 0
+        self.shared_count = 0
+        self.shared_size = 0
 
     def check_node(self):
         # Drop the STREAM-START event.
@@ -58,32 +82,127 @@ class Composer:
         self.get_event()
 
         self.anchors = {}
+        self.shared_nodes = {}
         return node
 
     def compose_node(self, parent, index):
-        if self.check_event(AliasEvent):
-            event = self.get_event()
-            anchor = event.anchor
-            if anchor not in self.anchors:
-                raise ComposerError(None, None, "found undefined alias %r"
-                        % anchor, event.start_mark)
-            return self.anchors[anchor]
-        event = self.peek_event()
-        anchor = event.anchor
-        if anchor is not None:
-            if anchor in self.anchors:
-                raise ComposerError("found duplicate anchor %r; first occurrence"
-                        % anchor, self.anchors[anchor].start_mark,
-                        "second occurrence", event.start_mark)
-        self.descend_resolver(parent, index)
-        if self.check_event(ScalarEvent):
-            node = self.compose_scalar_node(anchor)
-        elif self.check_event(SequenceStartEvent):
-            node = self.compose_sequence_node(anchor)
-        elif self.check_event(MappingStartEvent):
-            node = self.compose_mapping_node(anchor)
-        self.ascend_resolver()
-        return node
+        # The collections are composed with an explicit stack rather than
+        # by recursion, so that the depth of a document is not limited by
+        # the recursion limit. Each entry of the stack is a collection node
+        # being composed and, for a mapping, the key of the value that
+        # comes next, the anchor, the number of nodes composed for it and
+        # the number of the subtrees among them replaced by earlier equal
+        # ones and of the nodes in those. A replaced subtree is counted as
+        # a whole, without the subtrees replaced within it.
+        share = self.share_subtrees
+        stack = []
+        while True:
+            if self.check_event(AliasEvent):
+                event = self.get_event()
+                anchor = event.anchor
+                if anchor not in self.anchors:
+                    raise ComposerError(None, None, "found undefined alias %r"
+                            % anchor, event.start_mark)
+                node = self.anchors[anchor]
+                size = shared = saved = 0
+            else:
+                event = self.peek_event()
+                anchor = event.anchor
+                if anchor is not None:
+                    if anchor in self.anchors:
+                        raise ComposerError("found duplicate anchor %r; first occurrence"
+                                % anchor, self.anchors[anchor].start_mark,
+                                "second occurrence", event.start_mark)
+                self.descend_resolver(parent, index)
+                if self.check_event(ScalarEvent):
+                    node = self.compose_scalar_node(anchor)
+                    self.ascend_resolver()
+                    size = 1
+                    shared = saved = 0
+                    if share and anchor is None:
+                        shared_node = self.share_node(node)
+                        if shared_node is not node:
+                            node = shared_node
+                            shared = saved = 1
+                else:
+                    if self.check_event(SequenceStartEvent):
+                        node = self.compose_sequence_start(anchor)
+                    elif self.check_event(MappingStartEvent):
+                        node = self.compose_mapping_start(anchor)
+                    stack.append([node, None, anchor, 1, 0, 0])
+                    node = None
+
+            # Add the node to its collection and end the collections that
+            # are complete.
+            while True:
+                if node is not None:
+                    if not stack:
+                        self.shared_count += shared
+                        self.shared_size += saved
+                        return node
+                    entry = stack[-1]
+                    collection = entry[0]
+                    if isinstance(collection, SequenceNode):
+                        collection.value.append(node)
+                    elif entry[1] is None:
+                        entry[1] = node
+                    else:
+                        collection.value.append((entry[1], node))
+                        entry[1] = None
+                    entry[3] += size
+                    entry[4] += shared
+                    entry[5] += saved
+                entry = stack[-1]
+                collection, key = entry[0], entry[1]
+                if isinstance(collection, SequenceNode):
+                    if not self.check_event(SequenceEndEvent):
+                        parent, index = collection, len(collection.value)
+                        break
+                elif key is not None or not self.check_event(MappingEndEvent):
+                    parent, index = collection, key
+                    break
+                end_event = self.get_event()
+                collection.end_mark = end_event.end_mark
+                stack.pop()
+                self.ascend_resolver()
+                node = collection
+                size, shared, saved = entry[3:]
+                if share and entry[2] is None:
+                    shared_node = self.share_node(node)
+                    if shared_node is not node:
+                        node = shared_node
+                        shared, saved = 1, size
+
+    def share_node(self, node):
+        # Return the node composed earlier in the document that is equal to
+        # `node`, or `node` if there is none. A merged mapping is changed by
+        # `flatten_mapping` only if it has merge or value keys itself, so
+        # only the keys and their mappings are left out.
+        if isinstance(node, ScalarNode):
+            if node.tag in self.UNSHARED_TAGS:
+                return node
+            key = (node.id, node.tag, node.value, node.style)
+        elif isinstance(node, SequenceNode):
+            key = (node.id, node.tag, node.flow_style,
+                    tuple([id(item) for item in node.value]))
+        else:
+            items = []
+            for item_key, item_value in node.value:
+                if item_key.tag in self.UNSHARED_TAGS:
+                    return node
+                items.append((id(item_key), id(item_value)))
+            key = (node.id, node.tag, node.flow_style, tuple(items))
+        shared = self.shared_nodes.setdefault(key, node)
+        if shared is node:
+            self.shared_subtrees += 1
+        return shared
+
+    def share_info(self):
+        # Return the number of distinct subtrees, the number of subtrees
+        # replaced by an earlier equal one, not counting those within them,
+        # and the number of nodes in them.
+        return ShareInfo(self.shared_subtrees, self.shared_count,
+                self.shared_size)
 
     def compose_scalar_node(self, anchor):
         event = self.get_event()
@@ -96,7 +215,8 @@ class Composer:
             self.anchors[anchor] = node
         return node
 
-    def compose_sequence_node(self, anchor):
+    def compose_sequence_start(self, anchor):
+        # The items are added by `compose_node`.
         start_event = self.get_event()
         tag = start_event.tag
         if tag is None or tag == '!':
@@ -106,15 +226,10 @@ class Composer:
                 flow_style=start_event.flow_style)
         if anchor is not None:
             self.anchors[anchor] = node
-        index = 0
-        while not self.check_event(SequenceEndEvent):
-            node.value.append(self.compose_node(node, index))
-            index += 1
-        end_event = self.get_event()
-        node.end_mark = end_event.end_mark
         return node
 
-    def compose_mapping_node(self, anchor):
+    def compose_mapping_start(self, anchor):
+        # The items are added by `compose_node`.
         start_event = self.get_event()
         tag = start_event.tag
         if tag is None or tag == '!':
@@ -124,16 +239,4 @@ class Composer:
                 flow_style=start_event.flow_style)
         if anchor is not None:
             self.anchors[anchor] = node
-        while not self.check_event(MappingEndEvent):
-            #key_event = self.peek_event()
-            item_key = self.compose_node(node, None)
-            #if item_key in node.value:
-            #    raise ComposerError("while composing a mapping", start_event.start_mark,
-            #            "found duplicate key", key_event.start_mark)
-            item_value = self.compose_node(node, item_key)
-            #node.value[item_key] = item_value
-            node.value.append((item_key, item_value))
-        end_event = self.get_event()
-        node.end_mark = end_event.end_mark
         return node
-
@@ -2,6 +2,7 @@
 __all__ = [
     'BaseConstructor',
     'SafeConstructor',
+    'NumericSafeConstructor',
     'FullConstructor',
     'UnsafeConstructor',
     'Constructor',
@@ -9,23 +10,48 @@ __all__ = [
 ]
 
 from .error import *
+from .events import *
 from .nodes import *
+from .composer import Composer, ComposerError
+from .resolver import BaseResolver
 
-import collections.abc, datetime, base64, binascii, re, sys, types
+import array, collections.abc, datetime, base64, binascii, re, sys, types
 
 class ConstructorError(MarkedYAMLError):
     pass
 
+InternInfo = collections.namedtuple('InternInfo', 'strings duplicates saved')
+
 class BaseConstructor:
 
     yaml_constructors = {}
     yaml_multi_constructors = {}
 
+    # The constructors found by `find_constructor`, see
+    # `get_constructor_cache`, and the number of tags it keeps.
+    yaml_constructor_cache = None
+    yaml_constructor_cache_size = 1024
+
+    # With `intern_keys` set, equal string keys of mappings are made the
+    # same object, and with `intern_scalars` set to a length, so are equal
+    # string scalars up to that length. The strings are looked up in
+    # a table kept by the loader for all the documents it loads.
+    intern_keys = False
+    intern_scalars = None
+
     def __init__(self):
         self.constructed_objects = {}
         self.recursive_objects = {}
         self.state_generators = []
         self.deep_construct = False
+        self.constructor_cache = self.get_constructor_cache()
+        self.collection_constructors = self.get_collection_constructors()
+        self.intern_table = {}
+        self.intern_duplicates = 0
+        self.intern_saved = 0
+        self.intern_length = -1
+        if self.intern_scalars is not None:
+            self.intern_length = self.intern_scalars
 
     def check_data(self):
         # If there are more documents available?
@@ -53,6 +79,10 @@ class BaseConstructor:
 
     def construct_document(self, node):
         data = self.construct_object(node)
+        return self.complete_document(data)
+
+    def complete_document(self, data):
+        # Fill the objects whose construction was postponed.
         while self.state_generators:
             state_generators = self.state_generators
             self.state_generators = []
@@ -74,28 +104,69 @@ class BaseConstructor:
             raise ConstructorError(None, None,
                     "found unconstructable recursive node", node.start_mark)
         self.recursive_objects[node] = None
-        constructor = None
-        tag_suffix = None
-        if node.tag in self.yaml_constructors:
-            constructor = self.yaml_constructors[node.tag]
+        constructor, tag_suffix = self.find_constructor(node)
+        collection_kind = self.collection_constructors.get(constructor)
+        if collection_kind is not None  \
+                and isinstance(node, collection_kind[0]):
+            data = self.construct_collection(node, collection_kind)
         else:
-            for tag_prefix in self.yaml_multi_constructors:
-                if tag_prefix is not None and node.tag.startswith(tag_prefix):
-                    tag_suffix = node.tag[len(tag_prefix):]
-                    constructor = self.yaml_multi_constructors[tag_prefix]
-                    break
-            else:
-                if None in self.yaml_multi_constructors:
-                    tag_suffix = node.tag
-                    constructor = self.yaml_multi_constructors[None]
-                elif None in self.yaml_constructors:
-                    constructor = self.yaml_constructors[None]
-                elif isinstance(node, ScalarNode):
-                    constructor = self.__class__.construct_scalar
-                elif isinstance(node, SequenceNode):
-                    constructor = self.__class__.construct_sequence
-                elif isinstance(node, MappingNode):
-                    constructor = self.__class__.construct_mapping
+            data = self.call_constructor(node, constructor, tag_suffix)
+        self.constructed_objects[node] = data
+        del self.recursive_objects[node]
+        if deep:
+            self.deep_construct = old_deep
+        return data
+
+    @classmethod
+    def get_constructor_cache(cls):
+        # Return the dict from the tags and kinds of nodes to the results
+        # of `match_constructor`. It is filled as the tags are met, shared
+        # by the loaders of the class and emptied by `add_constructor` and
+        # `add_multi_constructor`. As with the resolvers, it is kept with
+        # copies of the constructors, so that it is emptied if they are
+        # changed directly.
+        cached = cls.__dict__.get('yaml_constructor_cache')
+        if cached is not None and cached[0] == cls.yaml_constructors    \
+                and cached[1] == cls.yaml_multi_constructors:
+            return cached[2]
+        cache = {}
+        cls.yaml_constructor_cache = (cls.yaml_constructors.copy(),
+                cls.yaml_multi_constructors.copy(), cache)
+        return cache
+
+    def find_constructor(self, node):
+        # Return the constructor of the node and the tag suffix for
+        # a multi constructor.
+        key = (node.tag, node.__class__)
+        cache = self.constructor_cache
+        if key in cache:
+            return cache[key]
+        result = self.match_constructor(node)
+        if len(cache) < self.yaml_constructor_cache_size:
+            cache[key] = result
+        return result
+
+    def match_constructor(self, node):
+        # Look the constructor of the node up in the registered ones.
+        if node.tag in self.yaml_constructors:
+            return self.yaml_constructors[node.tag], None
+        for tag_prefix in self.yaml_multi_constructors:
+            if tag_prefix is not None and node.tag.startswith(tag_prefix):
+                return (self.yaml_multi_constructors[tag_prefix],
+                        node.tag[len(tag_prefix):])
+        if None in self.yaml_multi_constructors:
+            return self.yaml_multi_constructors[None], node.tag
+        elif None in self.yaml_constructors:
+            return self.yaml_constructors[None], None
+        elif isinstance(node, ScalarNode):
+            return self.__class__.construct_scalar, None
+        elif isinstance(node, SequenceNode):
+            return self.__class__.construct_sequence, None
+        elif isinstance(node, MappingNode):
+            return self.__class__.construct_mapping, None
+        return None, None
+
+    def call_constructor(self, node, constructor, tag_suffix):
         if tag_suffix is None:
             data = constructor(self, node)
         else:
@@ -108,12 +179,124 @@ class BaseConstructor:
                     pass
             else:
                 self.state_generators.append(generator)
-        self.constructed_objects[node] = data
-        del self.recursive_objects[node]
-        if deep:
-            self.deep_construct = old_deep
         return data
 
+    def intern_string(self, value):
+        # Return the string in the intern table equal to `value`, adding
+        # `value` if there is none.
+        interned = self.intern_table.setdefault(value, value)
+        if interned is not value:
+            self.intern_duplicates += 1
+            self.intern_saved += sys.getsizeof(value)
+        return interned
+
+    def intern_info(self):
+        # Return the number of strings in the intern table, the number of
+        # equal strings replaced by them and the bytes those take, which
+        # are freed along with the events and nodes.
+        return InternInfo(len(self.intern_table), self.intern_duplicates,
+                self.intern_saved)
+
+    def get_collection_constructors(self):
+        # Return the dict from the constructors that `construct_collection`
+        # takes the place of to the kind of node each one fills and whether
+        # the collection is registered before its items are constructed.
+        # Nodes of other kinds are left to the constructor and its error.
+        return {
+            BaseConstructor.construct_sequence: (SequenceNode, False),
+            BaseConstructor.construct_mapping: (MappingNode, False),
+        }
+
+    def construct_collection(self, node, collection_kind):
+        # Construct a collection as `construct_sequence` and
+        # `construct_mapping` do, or as the collection constructors of
+        # SafeConstructor do without postponing, but with an explicit stack
+        # of the nested collections that are constructed the same way. Each
+        # entry of the stack is [node, data, index, key], where `index`
+        # counts the items, or the keys and values, added so far. A
+        # collection that is registered early is in `constructed_objects`
+        # while its items are constructed, so that aliases in them get the
+        # collection as the postponed constructors give it; the others stay
+        # in `recursive_objects` until their items are constructed.
+        constructed_objects = self.constructed_objects
+        recursive_objects = self.recursive_objects
+        collection_constructors = self.collection_constructors
+        intern_keys = self.intern_keys
+        stack = [self.start_collection(node, collection_kind)]
+        resumed = False
+        while True:
+            entry = stack[-1]
+            collection, data, index, key = entry
+            items = collection.value
+            is_sequence = isinstance(data, list)
+            count = len(items) if is_sequence else 2*len(items)
+            while index < count:
+                if resumed:
+                    # The value is the nested collection just completed.
+                    resumed = False
+                else:
+                    if is_sequence:
+                        child = items[index]
+                    else:
+                        child = items[index >> 1][index & 1]
+                    if child in constructed_objects:
+                        value = constructed_objects[child]
+                    else:
+                        if child in recursive_objects:
+                            raise ConstructorError(None, None,
+                                    "found unconstructable recursive node",
+                                    child.start_mark)
+                        recursive_objects[child] = None
+                        constructor, tag_suffix = self.find_constructor(child)
+                        collection_kind = collection_constructors.get(constructor)
+                        if collection_kind is not None  \
+                                and isinstance(child, collection_kind[0]):
+                            entry[2] = index
+                            entry[3] = key
+                            stack.append(self.start_collection(child,
+                                collection_kind))
+                            break
+                        value = self.call_constructor(child, constructor,
+                                tag_suffix)
+                        constructed_objects[child] = value
+                        del recursive_objects[child]
+                if is_sequence:
+                    data.append(value)
+                elif index & 1:
+                    data[key] = value
+                else:
+                    if not isinstance(value, collections.abc.Hashable):
+                        raise ConstructorError("while constructing a mapping",
+                                collection.start_mark, "found unhashable key",
+                                items[index >> 1][0].start_mark)
+                    if intern_keys and isinstance(value, str):
+                        value = self.intern_string(value)
+                    key = value
+                index += 1
+            else:
+                stack.pop()
+                if not stack:
+                    return data
+                constructed_objects[collection] = data
+                del recursive_objects[collection]
+                value = data
+                resumed = True
+
+    def start_collection(self, node, collection_kind):
+        # Return the stack entry of a collection for `construct_collection`.
+        node_class, early = collection_kind
+        if node_class is SequenceNode:
+            data = []
+        else:
+            data = {}
+        if early:
+            self.prepare_collection(node)
+            self.constructed_objects[node] = data
+        return [node, data, 0, None]
+
+    def prepare_collection(self, node):
+        pass
+
     def construct_scalar(self, node):
         if not isinstance(node, ScalarNode):
             raise ConstructorError(None, None,
@@ -140,6 +323,8 @@ class BaseConstructor:
             if not isinstance(key, collections.abc.Hashable):
                 raise ConstructorError("while constructing a mapping", node.start_mark,
                         "found unhashable key", key_node.start_mark)
+            if self.intern_keys and isinstance(key, str):
+                key = self.intern_string(key)
             value = self.construct_object(value_node, deep=deep)
             mapping[key] = value
         return mapping
@@ -161,12 +346,14 @@ class BaseConstructor:
         if not 'yaml_constructors' in cls.__dict__:
             cls.yaml_constructors = cls.yaml_constructors.copy()
         cls.yaml_constructors[tag] = constructor
+        cls.yaml_constructor_cache = None
 
     @classmethod
     def add_multi_constructor(cls, tag_prefix, multi_constructor):
         if not 'yaml_multi_constructors' in cls.__dict__:
             cls.yaml_multi_constructors = cls.yaml_multi_constructors.copy()
         cls.yaml_multi_constructors[tag_prefix] = multi_constructor
+        cls.yaml_constructor_cache = None
 
 class SafeConstructor(BaseConstructor):
 
@@ -217,6 +404,24 @@ class SafeConstructor(BaseConstructor):
             self.flatten_mapping(node)
         return super().construct_mapping(node, deep=deep)
 
+    def get_collection_constructors(self):
+        # Plain sequences and mappings are filled in place unless the class
+        # changes how they are constructed.
+        constructors = super().get_collection_constructors()
+        cls = type(self)
+        if not self.numeric_arrays  \
+                and cls.construct_sequence is BaseConstructor.construct_sequence:
+            constructors[SafeConstructor.construct_yaml_seq] = (SequenceNode, True)
+        if cls.construct_mapping is SafeConstructor.construct_mapping   \
+                and cls.flatten_mapping is SafeConstructor.flatten_mapping:
+            constructors[SafeConstructor.construct_yaml_map] = (MappingNode, True)
+        return constructors
+
+    def prepare_collection(self, node):
+        # Merge the mappings as `construct_mapping` does.
+        if isinstance(node, MappingNode):
+            self.flatten_mapping(node)
+
     def construct_yaml_null(self, node):
         self.construct_scalar(node)
         return None
@@ -234,8 +439,19 @@ class SafeConstructor(BaseConstructor):
         value = self.construct_scalar(node)
         return self.bool_values[value.lower()]
 
+    # The plain decimal ints and floats, which `int` and `float` convert
+    # the same way as `convert_yaml_int` and `convert_yaml_float`.
+    decimal_int_regexp = re.compile(r'[-+]?(?:0|[1-9][0-9]*)')
+    decimal_float_regexp = re.compile(
+            r'[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?')
+
     def construct_yaml_int(self, node):
         value = self.construct_scalar(node)
+        if self.decimal_int_regexp.fullmatch(value):
+            return int(value)
+        return self.convert_yaml_int(value)
+
+    def convert_yaml_int(self, value):
         value = value.replace('_', '')
         sign = +1
         if value[0] == '-':
@@ -269,6 +485,15 @@ class SafeConstructor(BaseConstructor):
 
     def construct_yaml_float(self, node):
         value = self.construct_scalar(node)
+        # The values that `float` reads, such as '3.14' and '1_000.5', it
+        # reads the same way as `convert_yaml_float`.
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        return self.convert_yaml_float(value)
+
+    def convert_yaml_float(self, value):
         value = value.replace('_', '').lower()
         sign = +1
         if value[0] == '-':
@@ -319,9 +544,30 @@ class SafeConstructor(BaseConstructor):
                 (?:[ \t]*(?P<tz>Z|(?P<tz_sign>[-+])(?P<tz_hour>[0-9][0-9]?)
                 (?::(?P<tz_minute>[0-9][0-9]))?))?)?$''', re.X)
 
+    # The dates and times that `fromisoformat` reads the same way as
+    # `convert_yaml_timestamp`; 'Z' is given to it as '+00:00'.
+    iso_timestamp_regexp = re.compile(
+            r'''[0-9]{4}-[0-9]{2}-[0-9]{2}
+                (?:[Tt ][0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]{3}|\.[0-9]{6})?
+                (?P<tz>Z|[-+][0-9]{2}:[0-9]{2})?)?''', re.X)
+
     def construct_yaml_timestamp(self, node):
         value = self.construct_scalar(node)
-        match = self.timestamp_regexp.match(node.value)
+        match = self.iso_timestamp_regexp.fullmatch(value)
+        if match:
+            try:
+                if len(value) == 10:
+                    return datetime.date.fromisoformat(value)
+                if match.group('tz') == 'Z':
+                    return datetime.datetime.fromisoformat(value[:-1]+'+00:00')
+                return datetime.datetime.fromisoformat(value)
+            except ValueError:
+                # Out of range; the error is that of `convert_yaml_timestamp`.
+                pass
+        return self.convert_yaml_timestamp(value)
+
+    def convert_yaml_timestamp(self, value):
+        match = self.timestamp_regexp.match(value)
         values = match.groupdict()
         year = int(values['year'])
         month = int(values['month'])
@@ -400,9 +646,17 @@ class SafeConstructor(BaseConstructor):
         data.update(value)
 
     def construct_yaml_str(self, node):
-        return self.construct_scalar(node)
+        value = self.construct_scalar(node)
+        if len(value) <= self.intern_length:
+            value = self.intern_string(value)
+        return value
 
     def construct_yaml_seq(self, node):
+        if self.numeric_arrays:
+            data = self.construct_numeric_sequence(node)
+            if data is not None:
+                yield data
+                return
         data = []
         yield data
         data.extend(self.construct_sequence(node))
@@ -428,6 +682,452 @@ class SafeConstructor(BaseConstructor):
                 "could not determine a constructor for the tag %r" % node.tag,
                 node.start_mark)
 
+    # Numeric arrays.
+    #
+    # With `numeric_arrays` set, a sequence whose items are all int and
+    # float scalars is constructed as an array: array.array('q') for
+    # ints and array.array('d') for floats or a mix of both, or the NumPy
+    # array of the same type if NumPy can be imported. The items in the
+    # plain decimal forms are checked with a single match over all of them
+    # and converted with `int` or `float`; the other forms are converted by
+    # their constructors. A sequence whose ints do not fit in the array is
+    # constructed as a list of the numbers.
+
+    numeric_arrays = False
+    numeric_array_numpy = True
+
+    numeric_tags = {'tag:yaml.org,2002:int', 'tag:yaml.org,2002:float'}
+
+    # The plain decimal ints and floats, one per line; the ints in a mix
+    # with floats have at most 15 digits, so that they are exact as floats.
+    numeric_int_regexp = re.compile(r'(?:{0}\n)*{0}'.format(
+            decimal_int_regexp.pattern))
+    numeric_exact_int_regexp = re.compile(r'(?:{0}\n)*{0}'.format(
+            r'[-+]?(?:0|[1-9][0-9]{0,14})'))
+    numeric_float_regexp = re.compile(r'(?:{0}\n)*{0}'.format(
+            decimal_float_regexp.pattern))
+
+    # The NumPy module once it is imported, or False if it cannot be.
+    numpy_module = None
+
+    def construct_numeric_sequence(self, node):
+        # Construct a sequence node of ints and floats as an array, or
+        # return None if it has other items.
+        if not isinstance(node, SequenceNode) or not node.value:
+            return None
+        items = node.value
+        numeric_tags = self.numeric_tags
+        for item in items:
+            if not isinstance(item, ScalarNode) or item.tag not in numeric_tags:
+                return None
+        return self.construct_numeric_array([item.value for item in items],
+                [item.tag for item in items], items.__getitem__)
+
+    def construct_numeric_array(self, values, tags, get_node):
+        # Construct the array of the int and float `values`; `get_node`
+        # returns the node of an item by its index.
+        floats = 'tag:yaml.org,2002:float' in tags
+        ints = not floats or 'tag:yaml.org,2002:int' in tags
+        numbers = None
+        constructors = self.yaml_constructors
+        if self.check_numeric_constructors():
+            try:
+                if not floats:
+                    if self.numeric_int_regexp.fullmatch('\n'.join(values)):
+                        numbers = list(map(int, values))
+                elif not ints:
+                    if self.numeric_float_regexp.fullmatch('\n'.join(values)):
+                        numbers = list(map(float, values))
+                else:
+                    int_values = []
+                    float_values = []
+                    for value, tag in zip(values, tags):
+                        if tag == 'tag:yaml.org,2002:int':
+                            int_values.append(value)
+                        else:
+                            float_values.append(value)
+                    if self.numeric_exact_int_regexp.fullmatch('\n'.join(int_values))  \
+                            and self.numeric_float_regexp.fullmatch(
+                                    '\n'.join(float_values)):
+                        numbers = list(map(float, values))
+            except ValueError:
+                # A quoted value with line breaks.
+                numbers = None
+        if numbers is None:
+            numbers = [constructors[tag](self, get_node(index))
+                    for index, tag in enumerate(tags)]
+            if floats and ints:
+                for number in numbers:
+                    if isinstance(number, int) and not -2**53 <= number <= 2**53:
+                        return numbers
+        try:
+            return self.make_numeric_array('d' if floats else 'q', numbers)
+        except (OverflowError, TypeError, ValueError):
+            # Ints that do not fit, or other objects from the constructors.
+            return numbers
+
+    def check_numeric_constructors(self):
+        # Check if the int and float constructors are the ones that convert
+        # the plain decimal values as `int` and `float` do.
+        constructors = self.yaml_constructors
+        for tag in self.numeric_tags:
+            if constructors.get(tag) is not self.direct_constructors[tag]:
+                return False
+        return True
+
+    def make_numeric_array(self, typecode, numbers):
+        numpy = self.get_numpy()
+        if numpy is not None:
+            return numpy.array(numbers,
+                    dtype=numpy.float64 if typecode == 'd' else numpy.int64)
+        return array.array(typecode, numbers)
+
+    @classmethod
+    def get_numpy(cls):
+        # NumPy is imported when the first array is made, not with yaml.
+        if not cls.numeric_array_numpy:
+            return None
+        if SafeConstructor.numpy_module is None:
+            try:
+                import numpy
+                SafeConstructor.numpy_module = numpy
+            except ImportError:
+                SafeConstructor.numpy_module = False
+        return SafeConstructor.numpy_module or None
+
+    # Direct construction.
+    #
+    # The documents of a loader without custom constructors are constructed
+    # right from the events, without composing the representation tree
+    # first. Anchored nodes, aliases, merged mappings and nodes with other
+    # than the standard tags are composed and constructed as usual; the
+    # `anchors` of the composer serve as the table of anchored nodes. The
+    # composer checks a whole document before it is constructed, so when a
+    # construction error occurs, the rest of the document is checked first.
+
+    # The methods that direct construction takes the place of.
+    direct_methods = [
+        (Composer, ['check_node', 'get_node', 'compose_document',
+            'compose_node', 'compose_scalar_node', 'compose_sequence_start',
+            'compose_mapping_start']),
+        (BaseResolver, ['descend_resolver', 'ascend_resolver']),
+    ]
+    direct_constructor_methods = ['construct_document', 'complete_document',
+            'construct_object', 'construct_scalar', 'construct_sequence',
+            'construct_mapping', 'flatten_mapping']
+
+    # The constructors that direct construction takes the place of. If one
+    # of the tags is given another constructor, even in the dict of
+    # SafeConstructor itself, the documents are composed as usual.
+    direct_constructors = {
+        'tag:yaml.org,2002:null': construct_yaml_null,
+        'tag:yaml.org,2002:bool': construct_yaml_bool,
+        'tag:yaml.org,2002:int': construct_yaml_int,
+        'tag:yaml.org,2002:float': construct_yaml_float,
+        'tag:yaml.org,2002:str': construct_yaml_str,
+        'tag:yaml.org,2002:seq': construct_yaml_seq,
+        'tag:yaml.org,2002:map': construct_yaml_map,
+    }
+
+    # Scalars that the constructors convert without postponing anything.
+    direct_scalar_tags = {
+        'tag:yaml.org,2002:int',
+        'tag:yaml.org,2002:float',
+        'tag:yaml.org,2002:binary',
+        'tag:yaml.org,2002:timestamp',
+    }
+
+    def check_direct(self):
+        # Check if the documents can be constructed from the events.
+        cls = type(self)
+        if cls.yaml_constructors is not SafeConstructor.yaml_constructors  \
+                or cls.yaml_multi_constructors is not   \
+                    SafeConstructor.yaml_multi_constructors    \
+                or getattr(cls, 'yaml_path_resolvers', True)   \
+                or getattr(cls, 'share_subtrees', False):
+            return False
+        constructors = cls.yaml_constructors
+        for tag, constructor in self.direct_constructors.items():
+            if constructors.get(tag) is not constructor:
+                return False
+        for base, names in self.direct_methods:
+            for name in names:
+                if getattr(cls, name, None) is not getattr(base, name):
+                    return False
+        for name in self.direct_constructor_methods:
+            if getattr(cls, name) is not getattr(SafeConstructor, name):
+                return False
+        return True
+
+    def get_data(self):
+        # Construct and return the next document.
+        if not self.check_direct():
+            return super().get_data()
+        if self.check_node():
+            # Drop the DOCUMENT-START event.
+            self.get_event()
+            return self.construct_direct_document()
+
+    def get_single_data(self):
+        # Ensure that the stream contains a single document and construct it.
+        if not self.check_direct():
+            return super().get_single_data()
+
+        # Drop the STREAM-START event.
+        self.get_event()
+
+        # Construct a document if the stream is not empty.
+        data = None
+        error = None
+        if not self.check_event(StreamEndEvent):
+            self.get_event()
+            start_mark = self.peek_event().start_mark
+            try:
+                data = self.construct_direct_document()
+            except YAMLError as exc:
+                if not isinstance(exc, ConstructorError):
+                    raise
+                error = exc
+            except Exception as exc:
+                error = exc
+
+        # Ensure that the stream contains no more documents.
+        if not self.check_event(StreamEndEvent):
+            event = self.get_event()
+            raise ComposerError("expected a single document in the stream",
+                    start_mark, "but found another document",
+                    event.start_mark)
+
+        # Drop the STREAM-END event.
+        self.get_event()
+
+        if error is not None:
+            raise error
+        return data
+
+    def construct_direct_document(self):
+        # The DOCUMENT-START event is dropped by the caller.
+        try:
+            data = self.construct_direct_object()
+        except YAMLError as exc:
+            if not isinstance(exc, ConstructorError):
+                raise
+            self.check_document_events()
+            raise
+        except Exception:
+            self.check_document_events()
+            raise
+
+        # Drop the DOCUMENT-END event.
+        self.get_event()
+
+        self.anchors = {}
+        return self.complete_document(data)
+
+    def check_document_events(self):
+        # Check the rest of the document the way the composer does.
+        while not self.check_event(DocumentEndEvent):
+            event = self.get_event()
+            if isinstance(event, AliasEvent):
+                if event.anchor not in self.anchors:
+                    raise ComposerError(None, None,
+                            "found undefined alias %r" % event.anchor,
+                            event.start_mark)
+            elif isinstance(event, NodeEvent) and event.anchor is not None:
+                if event.anchor in self.anchors:
+                    raise ComposerError("found duplicate anchor %r; first occurrence"
+                            % event.anchor, self.anchors[event.anchor].start_mark,
+                            "second occurrence", event.start_mark)
+                self.anchors[event.anchor] = event
+        self.get_event()
+        self.anchors = {}
+
+    def construct_direct_object(self):
+        # The collections are constructed with an explicit stack, as in
+        # `compose_node`. Each entry of the stack is [data, start event] for
+        # a sequence and [data, start event, merged pairs, key, key event]
+        # for a mapping; the key event is None until the next key is read.
+        stack = []
+        while True:
+            event = self.peek_event()
+            tag = None
+            if event.anchor is None:
+                tag = event.tag
+                if tag is None or tag == '!':
+                    if isinstance(event, ScalarEvent):
+                        tag = self.resolve(ScalarNode, event.value,
+                                event.implicit)
+                    elif isinstance(event, SequenceStartEvent):
+                        tag = self.resolve(SequenceNode, None, event.implicit)
+                    else:
+                        tag = self.resolve(MappingNode, None, event.implicit)
+            started = False
+            if tag is None:
+                data = self.construct_object(self.compose_node(None, None))
+            elif isinstance(event, ScalarEvent):
+                data = self.construct_direct_scalar(tag)
+            elif tag == 'tag:yaml.org,2002:seq'  \
+                    and isinstance(event, SequenceStartEvent):
+                self.get_event()
+                items = []
+                data = None
+                if self.numeric_arrays:
+                    data = self.construct_direct_numeric_sequence(items)
+                if data is None:
+                    stack.append([items, event])
+                    started = True
+            elif tag == 'tag:yaml.org,2002:map' \
+                    and isinstance(event, MappingStartEvent):
+                self.get_event()
+                stack.append([{}, event, [], None, None])
+                started = True
+            else:
+                data = self.construct_object(self.compose_node(None, None))
+
+            # Add the object to its collection and end the collections that
+            # are complete.
+            while True:
+                if not started:
+                    if not stack:
+                        return data
+                    entry = stack[-1]
+                    if len(entry) == 2:
+                        entry[0].append(data)
+                    else:
+                        entry[0][entry[3]] = data
+                        entry[3] = entry[4] = None
+                started = False
+                entry = stack[-1]
+                if len(entry) == 2:
+                    if not self.check_event(SequenceEndEvent):
+                        break
+                    self.get_event()
+                    data = entry[0]
+                else:
+                    while entry[4] is None  \
+                            and not self.check_event(MappingEndEvent):
+                        self.construct_direct_key(entry)
+                    if entry[4] is not None:
+                        break
+                    end_event = self.get_event()
+                    data = entry[0]
+                    if entry[2]:
+                        # The merged keys come first, as in `flatten_mapping`.
+                        node = MappingNode('tag:yaml.org,2002:map', entry[2],
+                                entry[1].start_mark, end_event.end_mark)
+                        mapping = self.construct_mapping(node)
+                        mapping.update(data)
+                        data = mapping
+                stack.pop()
+
+    def construct_direct_scalar(self, tag):
+        event = self.get_event()
+        if tag == 'tag:yaml.org,2002:str':
+            value = event.value
+            if len(value) <= self.intern_length:
+                value = self.intern_string(value)
+            return value
+        elif tag == 'tag:yaml.org,2002:null':
+            return None
+        elif tag == 'tag:yaml.org,2002:bool':
+            return self.bool_values[event.value.lower()]
+        elif tag == 'tag:yaml.org,2002:int'   \
+                and self.decimal_int_regexp.fullmatch(event.value):
+            return int(event.value)
+        elif tag == 'tag:yaml.org,2002:float':
+            try:
+                return float(event.value)
+            except ValueError:
+                pass
+        node = ScalarNode(tag, event.value,
+                event.start_mark, event.end_mark, style=event.style)
+        if tag in self.direct_scalar_tags:
+            return self.yaml_constructors[tag](self, node)
+        return self.construct_object(node)
+
+    def construct_direct_numeric_sequence(self, items):
+        # Construct the sequence that has just started as an array if its
+        # items are ints and floats. Otherwise add the items read so far to
+        # `items` and return None. Anchored items and aliases are composed,
+        # so that they count as they do in `construct_numeric_sequence`.
+        values = []
+        tags = []
+        nodes = []
+        numeric_tags = self.numeric_tags
+        node = None
+        while True:
+            event = self.peek_event()
+            if isinstance(event, ScalarEvent) and event.anchor is None:
+                tag = event.tag
+                if tag is None or tag == '!':
+                    tag = self.resolve(ScalarNode, event.value, event.implicit)
+                if tag not in numeric_tags:
+                    break
+                item = self.get_event()
+            elif isinstance(event, (ScalarEvent, AliasEvent)):
+                node = item = self.compose_node(None, None)
+                tag = item.tag
+                if not isinstance(item, ScalarNode) or tag not in numeric_tags:
+                    break
+                node = None
+            else:
+                break
+            values.append(item.value)
+            tags.append(tag)
+            nodes.append(item)
+        def get_node(index):
+            item = nodes[index]
+            if isinstance(item, Node):
+                return item
+            return ScalarNode(tags[index], item.value,
+                    item.start_mark, item.end_mark, style=item.style)
+        if values and node is None and self.check_event(SequenceEndEvent):
+            data = self.construct_numeric_array(values, tags, get_node)
+            self.get_event()
+            return data
+        constructors = self.yaml_constructors
+        for index, tag in enumerate(tags):
+            items.append(constructors[tag](self, get_node(index)))
+        if node is not None:
+            items.append(self.construct_object(node))
+        return None
+
+    def construct_direct_key(self, entry):
+        # Read the next key of a mapping, or a merge key and its value.
+        key_event = self.peek_event()
+        if isinstance(key_event, ScalarEvent) and key_event.anchor is None:
+            key_node = None
+            tag = key_event.tag
+            if tag is None or tag == '!':
+                tag = self.resolve(ScalarNode, key_event.value,
+                        key_event.implicit)
+        else:
+            key_node = self.compose_node(None, None)
+            tag = key_node.tag
+        if tag == 'tag:yaml.org,2002:merge':
+            if key_node is None:
+                self.get_event()
+                key_node = ScalarNode(tag, key_event.value,
+                        key_event.start_mark, key_event.end_mark)
+            entry[2].append((key_node, self.compose_node(None, None)))
+            return
+        if tag == 'tag:yaml.org,2002:value':
+            tag = 'tag:yaml.org,2002:str'
+            if key_node is not None:
+                key_node.tag = tag
+        if key_node is None:
+            key = self.construct_direct_scalar(tag)
+        else:
+            key = self.construct_object(key_node)
+        if not isinstance(key, collections.abc.Hashable):
+            raise ConstructorError("while constructing a mapping",
+                    entry[1].start_mark, "found unhashable key",
+                    key_event.start_mark)
+        if self.intern_keys and isinstance(key, str):
+            key = self.intern_string(key)
+        entry[3] = key
+        entry[4] = key_event
+
 SafeConstructor.add_constructor(
         'tag:yaml.org,2002:null',
         SafeConstructor.construct_yaml_null)
@@ -479,6 +1179,10 @@ SafeConstructor.add_constructor(
 SafeConstructor.add_constructor(None,
         SafeConstructor.construct_undefined)
 
+class NumericSafeConstructor(SafeConstructor):
+
+    numeric_arrays = True
+
 class FullConstructor(SafeConstructor):
     # 'extend' is blacklisted because it is used by
     # construct_python_object_apply to add `listitems` to a newly generate
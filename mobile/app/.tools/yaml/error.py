@@ -1,7 +1,29 @@
 
 __all__ = ['Mark', 'YAMLError', 'MarkedYAMLError']
 
-class Mark:
+class SlotState:
+    # Pickle protocols 0 and 1 cannot save objects with __slots__ by
+    # themselves, so the state is given as a dict of the slots and of the
+    # instance dictionary that subclasses without __slots__ have.
+
+    __slots__ = ()
+
+    def __getstate__(self):
+        state = dict(getattr(self, '__dict__', ()))
+        for cls in type(self).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            for key in [slots] if isinstance(slots, str) else slots:
+                if not key.startswith('__') and hasattr(self, key):
+                    state[key] = getattr(self, key)
+        return state
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+class Mark(SlotState):
+
+    __slots__ = ('name', 'index', 'line', 'column', 'buffer', 'pointer')
 
     def __init__(self, name, index, line, column, buffer, pointer):
         self.name = name
@@ -0,0 +1,361 @@
+
+# Parsing a YAML stream that arrives in pieces.
+#
+#   IncrementalParser()
+# The data is passed to the parser with `feed` as it arrives, and `close`
+# marks its end. `events` produces the events that can be decided from the
+# data fed so far.
+#
+# The Reader, Scanner and Parser pull their input, so they cannot stop in
+# the middle of a token. Instead, the state of the parser is saved before
+# each event. If the scanner looks past the data fed so far, the reader
+# raises IncompleteInput and the state is restored. The next call of
+# `events` continues from there once more data is fed. A retry scans the
+# data of the event again, so to keep the total work linear, an event is
+# retried only when the data fed since may end the token the scanner
+# stopped in: a closing quote for a quoted scalar, a line indented no
+# more than the current block for a plain or block scalar, a token after
+# spaces and comments, and so on. Otherwise it is retried once the
+# unconsumed data has doubled, or after `close`.
+#
+#   EventQueue.loader_class(Loader)
+# A subclass of `Loader` that composes and constructs documents from the
+# events put into its `queued_events` instead of parsing a stream.
+
+__all__ = ['IncrementalParser', 'EventQueue']
+
+from .error import Mark
+from .events import *
+from .reader import *
+from .scanner import *
+from .parser import *
+
+import codecs, collections, copy, re
+
+class IncompleteInput(Exception):
+    pass
+
+class IncrementalReader(Reader):
+    # IncrementalReader:
+    # - takes data from `feed` instead of a stream,
+    # - decodes and checks the data as it is fed,
+    # - raises IncompleteInput when more data is needed.
+
+    def __init__(self):
+        self.name = "<feed>"
+        self.stream = None
+        self.stream_pointer = 0
+        self.eof = False
+        self.buffer = ''
+        self.pointer = 0
+        self.raw_buffer = b''
+        self.raw_view = None
+        self.raw_decode = None
+        self.encoding = None
+        self.index = 0
+        self.line_breaks = None
+        self.has_bom = False
+        self.mark_pointer = 0
+        self.mark_breaks = 0
+        self.mark_line = 0
+        self.mark_column = 0
+        # The decoded data that is not in the buffer yet.
+        self.pending = []
+        self.pending_size = 0
+
+    def feed(self, data):
+        if self.eof:
+            raise ValueError("feed() after close()")
+        if isinstance(data, str) and not self.stream_pointer:
+            self.raw_buffer = ''
+        self.raw_buffer += data
+        self.stream_pointer += len(data)
+        self.decode()
+
+    def close(self):
+        if not self.eof:
+            self.eof = True
+            self.decode()
+
+    def decode(self):
+        if isinstance(self.raw_buffer, bytes) and self.raw_decode is None:
+            if len(self.raw_buffer) < 2 and not self.eof:
+                return
+            bom = self.raw_buffer[:2]
+            if bom == codecs.BOM_UTF16_LE:
+                self.raw_decode = codecs.utf_16_le_decode
+                self.encoding = 'utf-16-le'
+            elif bom == codecs.BOM_UTF16_BE:
+                self.raw_decode = codecs.utf_16_be_decode
+                self.encoding = 'utf-16-be'
+            else:
+                self.raw_decode = codecs.utf_8_decode
+                self.encoding = 'utf-8'
+        if self.raw_decode is not None:
+            try:
+                data, converted = self.raw_decode(self.raw_buffer,
+                        'strict', self.eof)
+            except UnicodeDecodeError as exc:
+                character = self.raw_buffer[exc.start]
+                position = self.stream_pointer-len(self.raw_buffer)+exc.start
+                raise ReaderError(self.name, position, character,
+                        exc.encoding, exc.reason)
+        else:
+            data = self.raw_buffer
+            converted = len(data)
+        self.check_printable(data, self.pending_size)
+        self.pending.append(data)
+        self.pending_size += len(data)
+        self.raw_buffer = self.raw_buffer[converted:]
+        if self.eof:
+            self.pending.append('\0')
+            self.raw_buffer = None
+
+    def extend_buffer(self):
+        # Replace the consumed part of the buffer with the pending data.
+        self.locate()
+        self.buffer = self.buffer[self.pointer:]+''.join(self.pending)
+        self.pointer = 0
+        self.line_breaks = None
+        self.mark_pointer = 0
+        self.mark_breaks = 0
+        self.pending = []
+        self.pending_size = 0
+
+    # Unlike Reader, `prefix` and `forward` need no character past the ones
+    # they return or move over, so a token that ends with the data fed so
+    # far, such as the '...' of a document, is not held back.
+
+    def prefix(self, length=1):
+        if self.pointer+length > len(self.buffer):
+            self.update(length)
+        return self.buffer[self.pointer:self.pointer+length]
+
+    def forward(self, length=1):
+        if self.pointer+length > len(self.buffer):
+            self.update(length)
+        self.pointer += length
+        self.index += length
+
+    def update(self, length):
+        if self.raw_buffer is not None:
+            raise IncompleteInput()
+
+    def get_mark(self):
+        # The buffer is trimmed as the data arrives, so marks have no
+        # snippets, as with file streams.
+        line, column = self.locate()
+        return Mark(self.name, self.index, line, column, None, None)
+
+class IncrementalParser(IncrementalReader, Scanner, Parser):
+
+    # The attributes that the scanner and the parser change in place.
+    MUTABLE_STATE = ['tokens', 'indents', 'possible_simple_keys',
+            'states', 'marks', 'tag_handles']
+
+    # The data that may end the token the scanner stopped in, by what it
+    # was scanning, see `stop_retry`. A match counts if it ends in the data
+    # fed after the stop. The plain and block scalars of a block end at
+    # a line indented no more than the block, or at a document marker; the
+    # content of a block scalar is indented at least by one.
+    BREAK = '[\r\n\x85\u2028\u2029]'
+    BLANK = '[ \t\r\n\x85\u2028\u2029]'
+    NON_BLANK = '[^ \t\r\n\x85\u2028\u2029]'
+    DOCUMENT_MARKER = BREAK+r'(?:---|\.\.\.)'
+    BLOCK_END = BREAK+' {0,%d}'+NON_BLANK
+    RETRY_PATTERNS = {
+        'plain': ':'+BLANK+'|'+BLANK+'#|'+DOCUMENT_MARKER,
+        'flow plain': r'[,?\[\]{}]|:[,\[\]{}]|:'+BLANK+'|'+BLANK+'#|'+DOCUMENT_MARKER,
+        'block': DOCUMENT_MARKER,
+        '"': r'(?:^|[^\\])(?:\\\\)*"|'+DOCUMENT_MARKER,
+        '\'': r"(?<!')(?:'')*'(?!')|"+DOCUMENT_MARKER,
+        'name': BLANK+r'|[,\[\]{}]',
+    }
+
+    # Between tokens, the scanner skips spaces, line breaks and comments.
+    # The state of the skipping is kept as the data before the stop: a line
+    # break on a line of spaces, '#' in a comment.
+    SKIP_END = re.compile('(?:^|'+BREAK+')[ \t]*[^ \t#\r\n\x85\u2028\u2029]')
+
+    def __init__(self):
+        IncrementalReader.__init__(self)
+        # Scanner and Parser are initialized once the encoding is known.
+        self.started = False
+        self.retry_size = 0
+        self.retry_pattern = None
+        self.retry_tail = ''
+        self.retry_checked = 0
+        self.scanning = None
+        self.space_start = 0
+
+    def events(self):
+        # Produce the events that can be decided from the data fed so far.
+        while True:
+            if not self.started:
+                if not self.pending:
+                    return
+                Scanner.__init__(self)
+                Parser.__init__(self)
+                self.started = True
+            if self.retry_size:
+                # The last event needed more data than was fed.
+                if not self.check_retry():
+                    return
+                self.retry_size = 0
+            if self.pending:
+                self.extend_buffer()
+            state = self.save_state()
+            try:
+                if not self.check_event():
+                    return
+                event = self.get_event()
+            except IncompleteInput:
+                retry = self.stop_retry()
+                self.restore_state(state)
+                self.retry_size = max(1, 2*(len(self.buffer)-self.pointer))
+                self.retry_pattern, self.retry_tail = retry
+                self.retry_checked = 0
+                return
+            yield event
+
+    def stop_retry(self):
+        # Return the pattern of the data that may end the token the scanner
+        # stopped in and the data before the stop to match it with, or None
+        # if any data may.
+        scanning = self.scanning
+        if scanning is None:
+            # Looking a few characters past an indicator.
+            return None, ''
+        if scanning == 'space':
+            data = self.buffer[self.space_start:]
+            line = data[max(map(data.rfind, '\r\n\x85\u2028\u2029'))+1:]
+            if '#' in line:
+                return self.SKIP_END, '#'
+            return self.SKIP_END, '\n'
+        if scanning == 'plain' and self.flow_level:
+            scanning = 'flow plain'
+        pattern = self.RETRY_PATTERNS[scanning]
+        if scanning == 'block':
+            pattern = self.BLOCK_END % max(self.indent, 0) + '|' + pattern
+        elif scanning == 'plain' and self.indent >= 0:
+            pattern = self.BLOCK_END % self.indent + '|' + pattern
+        pattern = re.compile(pattern)
+        tail = self.buffer[-max(self.indent, 0)-8:]
+        for match in pattern.finditer(tail):
+            if match.end() > len(tail)-4:
+                # The scanner stopped just after the end of the token, while
+                # looking a few characters further.
+                return None, ''
+        return pattern, tail
+
+    def check_retry(self):
+        # Check if the event that needed more data is to be retried. Each
+        # piece of data fed since the stop is checked once.
+        if self.eof or self.retry_pattern is None and self.pending    \
+                or self.pending_size+len(self.buffer)-self.pointer  \
+                    >= self.retry_size:
+            return True
+        pattern = self.retry_pattern
+        for data in self.pending[self.retry_checked:]:
+            tail = self.retry_tail
+            data = tail+data
+            for match in pattern.finditer(data):
+                if match.end() > len(tail):
+                    return True
+            if pattern is self.SKIP_END:
+                end = max(map(data.rfind, '\r\n\x85\u2028\u2029'))
+                if '#' in data[end+1:] or end < 0 and tail == '#':
+                    self.retry_tail = '#'
+                else:
+                    self.retry_tail = '\n'
+            else:
+                self.retry_tail = data[-len(tail):]
+            self.retry_checked += 1
+        return False
+
+    # What the scanner is scanning, for `stop_retry`.
+
+    def scan_to_next_token(self):
+        self.scanning = 'space'
+        self.space_start = self.pointer
+        Scanner.scan_to_next_token(self)
+        self.scanning = None
+
+    def scan_plain_value(self):
+        self.scanning = 'plain'
+        value = Scanner.scan_plain_value(self)
+        self.scanning = None
+        return value
+
+    def scan_flow_scalar_value(self, style):
+        self.scanning = style
+        value = Scanner.scan_flow_scalar_value(self, style)
+        self.scanning = None
+        return value
+
+    def scan_block_scalar(self, style):
+        self.scanning = 'block'
+        token = Scanner.scan_block_scalar(self, style)
+        self.scanning = None
+        return token
+
+    def scan_anchor(self, TokenClass):
+        self.scanning = 'name'
+        token = Scanner.scan_anchor(self, TokenClass)
+        self.scanning = None
+        return token
+
+    def scan_tag(self):
+        self.scanning = 'name'
+        token = Scanner.scan_tag(self)
+        self.scanning = None
+        return token
+
+    def dispose(self):
+        # There is no file to unmap.
+        Parser.dispose(self)
+
+    def save_state(self):
+        state = self.__dict__.copy()
+        for name in self.MUTABLE_STATE:
+            state[name] = copy.copy(state[name])
+        return state
+
+    def restore_state(self, state):
+        self.__dict__.update(state)
+
+class EventQueue:
+    # EventQueue takes the place of Parser in a Loader. The events must be
+    # queued before they are composed, so a document is loaded only after
+    # its DOCUMENT-END event is queued.
+
+    loader_classes = {}
+
+    @classmethod
+    def loader_class(cls, Loader):
+        if Loader not in cls.loader_classes:
+            cls.loader_classes[Loader] = type(Loader.__name__,
+                    (cls, Loader), {})
+        return cls.loader_classes[Loader]
+
+    def __init__(self):
+        super().__init__('')
+        self.queued_events = collections.deque()
+
+    def check_event(self, *choices):
+        # Check the type of the next event.
+        if self.queued_events:
+            if not choices:
+                return True
+            for choice in choices:
+                if isinstance(self.queued_events[0], choice):
+                    return True
+        return False
+
+    def peek_event(self):
+        # Get the next event.
+        return self.queued_events[0]
+
+    def get_event(self):
+        # Get the next event and proceed further.
+        return self.queued_events.popleft()
@@ -1,5 +1,5 @@
 
-__all__ = ['BaseLoader', 'FullLoader', 'SafeLoader', 'Loader', 'UnsafeLoader']
+__all__ = ['BaseLoader', 'FullLoader', 'SafeLoader', 'NumericSafeLoader', 'Loader', 'UnsafeLoader']
 
 from .reader import *
 from .scanner import *
@@ -18,6 +18,10 @@ class BaseLoader(Reader, Scanner, Parser, Composer, BaseConstructor, BaseResolve
         BaseConstructor.__init__(self)
         BaseResolver.__init__(self)
 
+    def dispose(self):
+        Reader.dispose(self)
+        Parser.dispose(self)
+
 class FullLoader(Reader, Scanner, Parser, Composer, FullConstructor, Resolver):
 
     def __init__(self, stream):
@@ -28,6 +32,10 @@ class FullLoader(Reader, Scanner, Parser, Composer, FullConstructor, Resolver):
         FullConstructor.__init__(self)
         Resolver.__init__(self)
 
+    def dispose(self):
+        Reader.dispose(self)
+        Parser.dispose(self)
+
 class SafeLoader(Reader, Scanner, Parser, Composer, SafeConstructor, Resolver):
 
     def __init__(self, stream):
@@ -38,6 +46,25 @@ class SafeLoader(Reader, Scanner, Parser, Composer, SafeConstructor, Resolver):
         SafeConstructor.__init__(self)
         Resolver.__init__(self)
 
+    def dispose(self):
+        Reader.dispose(self)
+        Parser.dispose(self)
+
+class NumericSafeLoader(Reader, Scanner, Parser, Composer,
+        NumericSafeConstructor, Resolver):
+
+    def __init__(self, stream):
+        Reader.__init__(self, stream)
+        Scanner.__init__(self)
+        Parser.__init__(self)
+        Composer.__init__(self)
+        NumericSafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+    def dispose(self):
+        Reader.dispose(self)
+        Parser.dispose(self)
+
 class Loader(Reader, Scanner, Parser, Composer, Constructor, Resolver):
 
     def __init__(self, stream):
@@ -48,6 +75,10 @@ class Loader(Reader, Scanner, Parser, Composer, Constructor, Resolver):
         Constructor.__init__(self)
         Resolver.__init__(self)
 
+    def dispose(self):
+        Reader.dispose(self)
+        Parser.dispose(self)
+
 # UnsafeLoader is the same as Loader (which is and was always unsafe on
 # untrusted input). Use of either Loader or UnsafeLoader should be rare, since
 # FullLoad should be able to load almost all YAML safely. Loader is left intact
@@ -61,3 +92,21 @@ class UnsafeLoader(Reader, Scanner, Parser, Composer, Constructor, Resolver):
         Composer.__init__(self)
         Constructor.__init__(self)
         Resolver.__init__(self)
+
+    def dispose(self):
+        Reader.dispose(self)
+        Parser.dispose(self)
+
+# The subclasses made by `loader_class`.
+loader_classes = {}
+
+def loader_class(Loader, **options):
+    # Return a subclass of `Loader` whose class attributes, such as
+    # `intern_keys` or `share_subtrees`, are set to `options`, or `Loader`
+    # itself if they are already. Each subclass is made once.
+    if all(getattr(Loader, name) == value for name, value in options.items()):
+        return Loader
+    key = (Loader,)+tuple(sorted(options.items()))
+    if key not in loader_classes:
+        loader_classes[key] = type(Loader.__name__, (Loader,), options)
+    return loader_classes[key]
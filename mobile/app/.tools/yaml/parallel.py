@@ -0,0 +1,127 @@
+
+# Loading the documents of a multi-document stream in worker processes.
+#
+# A cheap pre-pass splits the decoded stream into chunks at the '---'
+# document start markers. A '---' or '...' at the beginning of a line is
+# always a document marker for the scanner: block scalar content is
+# indented, and quoted and plain scalars may not contain a marker line.
+# Directives belong to the document that follows them, so a chunk starts
+# at the directives after a '...' line. Where the pre-pass cannot tell
+# whether a '%' line is a directive, the chunks are not split. Each chunk
+# is loaded with `load_all` in a worker and the documents are yielded in
+# order.
+#
+# If a chunk fails to load, the stream is reloaded sequentially from the
+# start, skipping the documents already yielded, so that the error is the
+# one `load_all` would raise. A file-like stream is read into memory first
+# so that it can be reloaded.
+
+__all__ = ['parallel_load_all']
+
+from .reader import Reader, ReaderError
+
+import concurrent.futures, io, re, sys
+
+BREAKS = '\r\n\x85\u2028\u2029'
+
+# A document marker at the beginning of a line.
+MARKER = re.compile('(?:(?<=[%s])|^)(?:---|\\.\\.\\.)(?=[\0 \t%s]|$)'
+        % (BREAKS, BREAKS))
+# The rest of a line including its line break.
+LINE = re.compile('[^%s]*(?:\r\n|[%s])?' % (BREAKS, BREAKS))
+# A line that starts with '%'.
+PERCENT_LINE = re.compile('(?:(?<=[%s])|^)%%' % BREAKS)
+# Directive, comment and empty lines only.
+DIRECTIVES = re.compile('(?:(?:%%[^%s]*|[ \t]*(?:#[^%s]*)?)(?:\r\n|[%s]))*'
+        % (BREAKS, BREAKS, BREAKS))
+
+def split_documents(text):
+    # Return the chunks of `text` that may be loaded independently.
+    starts = [0]
+    previous = None
+    for match in MARKER.finditer(text):
+        position = match.start()
+        if match.group() == '---':
+            if previous is not None and previous.group() == '...':
+                # The directives of this document follow the '...' line.
+                start = LINE.match(text, previous.end()).end()
+                if DIRECTIVES.fullmatch(text, start, position):
+                    starts.append(start)
+            else:
+                # Keep the chunks together if a '%' line before the marker
+                # might be a directive of this document.
+                start = previous.start() if previous is not None else 0
+                if not PERCENT_LINE.search(text, start, position):
+                    starts.append(position)
+        previous = match
+    starts.append(len(text))
+    return [text[start:end] for start, end in zip(starts, starts[1:])
+            if end > start]
+
+def load_chunk(chunk, Loader):
+    loader = Loader(chunk)
+    try:
+        data = []
+        while loader.check_data():
+            data.append(loader.get_data())
+        return data
+    finally:
+        loader.dispose()
+
+def load_sequentially(stream, Loader, skip):
+    loader = Loader(stream())
+    try:
+        for _ in range(skip):
+            loader.check_node()
+            loader.get_node()
+        while loader.check_data():
+            yield loader.get_data()
+    finally:
+        loader.dispose()
+
+def reopen(stream):
+    # Return a function producing a fresh copy of the stream.
+    if not hasattr(stream, 'read'):
+        return lambda: stream
+    data = stream.read()
+    name = getattr(stream, 'name', "<file>")
+    def open_copy():
+        if isinstance(data, str):
+            copy = io.StringIO(data)
+        else:
+            copy = io.BytesIO(data)
+        copy.name = name
+        return copy
+    return open_copy
+
+def parallel_load_all(stream, Loader, workers):
+    """
+    Parse all YAML documents in a stream in `workers` processes
+    and produce corresponding Python objects in order.
+    """
+    stream = reopen(stream)
+    try:
+        reader = Reader(stream())
+        reader.update(sys.maxsize)
+    except ReaderError:
+        yield from load_sequentially(stream, Loader, 0)
+        return
+    chunks = split_documents(reader.buffer[reader.pointer:-1])
+    if len(chunks) < 2:
+        yield from load_sequentially(stream, Loader, 0)
+        return
+    executor = concurrent.futures.ProcessPoolExecutor(workers)
+    count = 0
+    try:
+        results = executor.map(load_chunk, chunks, [Loader]*len(chunks),
+                chunksize=max(1, len(chunks)//(workers*4)))
+        try:
+            for data in results:
+                for item in data:
+                    yield item
+                    count += 1
+        except Exception:
+            # Produce the error that a sequential load raises.
+            yield from load_sequentially(stream, Loader, count)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -425,6 +425,16 @@ class Parser:
         return self.parse_block_mapping_key()
 
     def parse_block_mapping_key(self):
+        # The fast path is in Scanner; other token sources are parsed token
+        # by token.
+        if hasattr(self, 'scan_block_mapping_key'):
+            key = self.scan_block_mapping_key()
+            if key is not None:
+                # KEY SCALAR VALUE, scanned without the tokens.
+                value, start_mark, end_mark = key
+                self.state = self.parse_block_mapping_simple_value
+                return ScalarEvent(None, None, (True, False), value,
+                        start_mark, end_mark)
         if self.check_token(KeyToken):
             token = self.get_token()
             if not self.check_token(KeyToken, ValueToken, BlockEndToken):
@@ -443,6 +453,26 @@ class Parser:
         self.marks.pop()
         return event
 
+    def parse_block_mapping_simple_value(self):
+        value = self.scan_block_mapping_value()
+        if value is None:
+            return self.parse_block_mapping_value()
+        if not isinstance(value, tuple):
+            # VALUE BLOCK-MAPPING-START, scanned without the tokens.
+            self.states.append(self.parse_block_mapping_key)
+            self.marks.append(value)
+            self.state = self.parse_block_mapping_key
+            return MappingStartEvent(None, None, True, value, value,
+                    flow_style=False)
+        value, start_mark, end_mark, style = value
+        if style is None:
+            implicit = (True, False)
+        else:
+            implicit = (False, True)
+        self.state = self.parse_block_mapping_key
+        return ScalarEvent(None, None, implicit, value,
+                start_mark, end_mark, style=style)
+
     def parse_block_mapping_value(self):
         if self.check_token(ValueToken):
             token = self.get_token()
@@ -0,0 +1,456 @@
+
+# Selecting parts of YAML documents without loading them whole.
+#
+#   iter_path(stream, ['paths', '*', '*'])
+# A path is a list of mapping keys and sequence indices; '*' matches any key
+# or index. A key matches only a key of the same type, so 1 matches neither
+# True nor 1.0. The documents are read as events, and only the nodes that match
+# the path are composed and constructed. The events of the other nodes are
+# skipped, except for anchored nodes, which are composed so that aliases
+# to them can be resolved. Each match is produced as a pair of the keys
+# leading to the node and the constructed object.
+#
+# A collection on the way to a match that is anchored, aliased or tagged
+# with other than the standard seq and map tags is constructed as a whole,
+# and the rest of the path is matched against the constructed object.
+# The matches in the mappings merged with '<<' come after the other matches
+# of the merging mapping. A key that occurs more than once in a mapping is
+# matched each time. Each match is constructed on its own, so two matches
+# that refer to the same anchor get separate copies of it. The path
+# resolvers of the loader see every node at its place in the document,
+# as they do in `load`.
+#
+#   load_projection(stream, SafeLoader, include=[['info']], exclude=[...])
+# The document is constructed with only the parts that match one of the
+# `include` paths (all of it if `include` is None) and none of the `exclude`
+# paths. The collections on the way to an included node are kept, with the
+# keys and items that are not included left out. The other nodes are
+# skipped as in `iter_path`, so errors in their contents that the composer
+# or the constructor would find are not reported.
+
+__all__ = ['iter_path', 'iter_paths', 'load_projection']
+
+from .events import *
+from .nodes import *
+from .composer import ComposerError
+from .constructor import SafeConstructor, ConstructorError
+from .loader import SafeLoader
+
+import collections.abc
+
+WILDCARD = '*'
+
+# The result of `construct_key` for a merge key.
+MERGED = object()
+
+# The result of `project_node` for a node that is not included.
+OMITTED = object()
+
+class PathSelector:
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.direct = isinstance(loader, SafeConstructor)   \
+                and loader.check_direct()
+
+    def select_document(self, paths):
+        # Produce the matches of the next document.
+        loader = self.loader
+
+        # Drop the DOCUMENT-START event.
+        loader.get_event()
+
+        yield from self.select_node(paths, (), None, None)
+
+        # Drop the DOCUMENT-END event.
+        loader.get_event()
+
+        loader.anchors = {}
+        loader.shared_nodes = {}
+
+    def select_node(self, paths, keys, parent, index):
+        # Produce the matches of `paths` in the node that starts with the
+        # next event; `keys` lead to the node and match the paths so far.
+        # The node is at `index` of `parent`, as in `compose_node`.
+        loader = self.loader
+        depth = len(keys)
+        event = loader.peek_event()
+        if isinstance(event, ScalarEvent) and event.anchor is None:
+            if any(len(path) == depth for path in paths):
+                yield keys, self.construct_node(parent, index)
+            else:
+                self.skip_node(parent, index)
+            return
+        if not self.check_standard(event, parent, index)   \
+                or any(len(path) == depth for path in paths):
+            yield from select_data(self.construct_node(parent, index),
+                    paths, keys)
+            return
+        node = self.start_collection(event, parent, index)
+        if isinstance(node, SequenceNode):
+            item_index = 0
+            while not loader.check_event(SequenceEndEvent):
+                selected = match_paths(paths, depth, item_index)
+                if selected:
+                    yield from self.select_node(selected,
+                            keys+(item_index,), node, item_index)
+                else:
+                    self.skip_node(node, item_index)
+                item_index += 1
+        else:
+            merge = []
+            explicit = []
+            while not loader.check_event(MappingEndEvent):
+                key, key_node = self.construct_key(event, merge, node)
+                if key is MERGED:
+                    continue
+                explicit.append(key)
+                selected = match_paths(paths, depth, key)
+                if selected:
+                    yield from self.select_node(selected, keys+(key,),
+                            node, key_node)
+                else:
+                    self.skip_node(node, key_node)
+            if merge:
+                # The merged keys that are not given explicitly.
+                data = self.construct_merge(event, merge)
+                for key in explicit:
+                    data.pop(key, None)
+                yield from select_data(data, paths, keys)
+        self.end_collection()
+
+    def project_single_document(self, include, exclude):
+        # Ensure that the stream contains a single document and construct
+        # it restricted to the `include` paths and without the `exclude`
+        # paths, as in `get_single_data`.
+        loader = self.loader
+
+        # Drop the STREAM-START event.
+        loader.get_event()
+
+        # Construct a document if the stream is not empty.
+        data = None
+        if not loader.check_event(StreamEndEvent):
+            # Drop the DOCUMENT-START event.
+            loader.get_event()
+
+            start_mark = loader.peek_event().start_mark
+            data = self.project_node(include, exclude, 0, None, None)
+            if data is OMITTED:
+                data = None
+
+            # Drop the DOCUMENT-END event.
+            loader.get_event()
+
+            loader.anchors = {}
+            loader.shared_nodes = {}
+        loader.shared_nodes = {}
+
+        # Ensure that the stream contains no more documents.
+        if not loader.check_event(StreamEndEvent):
+            event = loader.get_event()
+            raise ComposerError("expected a single document in the stream",
+                    start_mark, "but found another document",
+                    event.start_mark)
+
+        # Drop the STREAM-END event.
+        loader.get_event()
+
+        return data
+
+    def project_node(self, include, exclude, depth, parent, index):
+        # Construct the node that starts with the next event restricted to
+        # the `include` paths and without the `exclude` paths, or return
+        # OMITTED if none of it is included. `include` is None if the node
+        # is included whole. The node is at `index` of `parent`.
+        loader = self.loader
+        if include is not None:
+            if not include:
+                self.skip_node(parent, index)
+                return OMITTED
+            if any(len(path) == depth for path in include):
+                include = None
+        if any(len(path) == depth for path in exclude):
+            self.skip_node(parent, index)
+            return OMITTED
+        if include is None and not exclude:
+            return self.construct_node(parent, index)
+        event = loader.peek_event()
+        if isinstance(event, ScalarEvent) and event.anchor is None:
+            if include is None:
+                return self.construct_node(parent, index)
+            self.skip_node(parent, index)
+            return OMITTED
+        if not self.check_standard(event, parent, index):
+            return project_data(self.construct_node(parent, index), include, exclude, depth)
+        node = self.start_collection(event, parent, index)
+        if isinstance(node, SequenceNode):
+            data = []
+            item_index = 0
+            while not loader.check_event(SequenceEndEvent):
+                value = self.project_node(
+                        match_paths(include, depth, item_index),
+                        match_paths(exclude, depth, item_index), depth+1,
+                        node, item_index)
+                if value is not OMITTED:
+                    data.append(value)
+                item_index += 1
+        else:
+            data = {}
+            merge = []
+            explicit = set()
+            while not loader.check_event(MappingEndEvent):
+                key, key_node = self.construct_key(event, merge, node)
+                if key is MERGED:
+                    continue
+                explicit.add(key)
+                value = self.project_node(match_paths(include, depth, key),
+                        match_paths(exclude, depth, key), depth+1,
+                        node, key_node)
+                if value is not OMITTED:
+                    data[key] = value
+                else:
+                    data.pop(key, None)
+            if merge:
+                # The merged keys come first, as in `flatten_mapping`, and
+                # the explicit keys override them.
+                merged = {}
+                for key, value in self.construct_merge(event, merge).items():
+                    if key in explicit:
+                        if key in data:
+                            merged[key] = data[key]
+                        continue
+                    value = project_data(value, match_paths(include, depth, key),
+                            match_paths(exclude, depth, key), depth+1)
+                    if value is not OMITTED:
+                        merged[key] = value
+                merged.update(data)
+                data = merged
+        self.end_collection()
+        return data
+
+    def construct_key(self, event, merge, parent):
+        # Construct the next key of the mapping started by `event`, whose
+        # node is `parent`, and return it with its node, which is None if
+        # the key is constructed from the events. The pair of a merge key is
+        # composed and added to `merge` instead, and MERGED is returned.
+        loader = self.loader
+        key_event = loader.peek_event()
+        tag = self.resolve_key(parent)
+        if tag == 'tag:yaml.org,2002:merge':
+            key_node = loader.compose_node(parent, None)
+            merge.append((key_node, loader.compose_node(parent, key_node)))
+            return MERGED, None
+        elif tag == 'tag:yaml.org,2002:value':
+            # A value key is a string key, as in `flatten_mapping`.
+            key_node = loader.compose_node(parent, None)
+            key = key_node.value
+        else:
+            if self.direct:
+                key_node = None
+                key = loader.construct_direct_object()
+            else:
+                key_node = loader.compose_node(parent, None)
+                key = loader.construct_object(key_node)
+            key = loader.complete_document(key)
+            if not isinstance(key, collections.abc.Hashable):
+                raise ConstructorError("while constructing a mapping",
+                        event.start_mark, "found unhashable key",
+                        key_event.start_mark)
+        if loader.intern_keys and isinstance(key, str):
+            key = loader.intern_string(key)
+        return key, key_node
+
+    def construct_merge(self, event, merge):
+        # Construct the mapping of the merge pairs of the mapping started
+        # by `event`; the MAPPING-END event is next.
+        loader = self.loader
+        node = MappingNode('tag:yaml.org,2002:map', merge,
+                event.start_mark, loader.peek_event().end_mark)
+        return loader.complete_document(loader.construct_object(node))
+
+    def resolve(self, kind, event, parent, index):
+        # Resolve the tag of the node that starts with `event` as the
+        # composer does for the node at `index` of `parent`, with the state
+        # of the path resolvers below `parent`.
+        tag = event.tag
+        if tag is None or tag == '!':
+            loader = self.loader
+            value = event.value if kind is ScalarNode else None
+            loader.descend_resolver(parent, index)
+            tag = loader.resolve(kind, value, event.implicit)
+            loader.ascend_resolver()
+        return tag
+
+    def check_standard(self, event, parent, index):
+        # Check if the event starts an unanchored seq or map.
+        if event.anchor is not None:
+            return False
+        if isinstance(event, SequenceStartEvent):
+            kind = SequenceNode
+            standard = 'tag:yaml.org,2002:seq'
+        else:
+            kind = MappingNode
+            standard = 'tag:yaml.org,2002:map'
+        return self.resolve(kind, event, parent, index) == standard
+
+    def resolve_key(self, parent):
+        # Return the tag of the next key of `parent` if it is a merge or
+        # value key of SafeConstructor.
+        loader = self.loader
+        event = loader.peek_event()
+        if not isinstance(event, ScalarEvent)   \
+                or not isinstance(loader, SafeConstructor):
+            return None
+        tag = self.resolve(ScalarNode, event, parent, None)
+        if tag in ['tag:yaml.org,2002:merge', 'tag:yaml.org,2002:value']:
+            return tag
+
+    def start_collection(self, event, parent, index):
+        # Drop the start event of a standard collection at `index` of
+        # `parent` and return a node that stands for it as the parent of
+        # its items, for the path resolvers. They stay below the node
+        # until `end_collection`.
+        loader = self.loader
+        loader.get_event()
+        loader.descend_resolver(parent, index)
+        if isinstance(event, SequenceStartEvent):
+            return SequenceNode('tag:yaml.org,2002:seq', [],
+                    event.start_mark, event.end_mark)
+        return MappingNode('tag:yaml.org,2002:map', [],
+                event.start_mark, event.end_mark)
+
+    def end_collection(self):
+        # Drop the end event of the collection.
+        loader = self.loader
+        loader.ascend_resolver()
+        loader.get_event()
+
+    def construct_node(self, parent, index):
+        # Construct the node that starts with the next event.
+        loader = self.loader
+        if self.direct:
+            data = loader.construct_direct_object()
+        else:
+            data = loader.construct_object(loader.compose_node(parent, index))
+        return loader.complete_document(data)
+
+    def skip_node(self, parent, index):
+        # Skip the events of the node that starts with the next event.
+        loader = self.loader
+        if loader.yaml_path_resolvers:
+            # The anchored nodes in it are to be composed at their places.
+            loader.compose_node(parent, index)
+            return
+        depth = 0
+        while True:
+            event = loader.peek_event()
+            if isinstance(event, AliasEvent):
+                if event.anchor not in loader.anchors:
+                    raise ComposerError(None, None, "found undefined alias %r"
+                            % event.anchor, event.start_mark)
+                loader.get_event()
+            elif isinstance(event, NodeEvent) and event.anchor is not None:
+                loader.compose_node(None, None)
+            else:
+                loader.get_event()
+                if isinstance(event, CollectionStartEvent):
+                    depth += 1
+                elif isinstance(event, CollectionEndEvent):
+                    depth -= 1
+            if not depth:
+                return
+
+def match_paths(paths, depth, key):
+    # Return the paths that match `key` at `depth`.
+    if paths is None:
+        return None
+    # The type is compared as well, so that 1 and True are different keys.
+    return [path for path in paths if path[depth] == WILDCARD
+            or type(path[depth]) is type(key) and path[depth] == key]
+
+def select_data(data, paths, keys):
+    # Produce the matches of `paths` in a constructed object.
+    depth = len(keys)
+    if any(len(path) == depth for path in paths):
+        yield keys, data
+        paths = [path for path in paths if len(path) > depth]
+        if not paths:
+            return
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return
+    for key, value in items:
+        selected = match_paths(paths, depth, key)
+        if selected:
+            yield from select_data(value, selected, keys+(key,))
+
+def project_data(data, include, exclude, depth):
+    # Restrict a constructed object as `project_node` does.
+    if include is not None:
+        if not include:
+            return OMITTED
+        if any(len(path) == depth for path in include):
+            include = None
+    if any(len(path) == depth for path in exclude):
+        return OMITTED
+    if include is None and not exclude:
+        return data
+    if isinstance(data, dict):
+        projection = {}
+        for key, value in data.items():
+            value = project_data(value, match_paths(include, depth, key),
+                    match_paths(exclude, depth, key), depth+1)
+            if value is not OMITTED:
+                projection[key] = value
+        return projection
+    elif isinstance(data, list):
+        projection = []
+        for index, value in enumerate(data):
+            value = project_data(value, match_paths(include, depth, index),
+                    match_paths(exclude, depth, index), depth+1)
+            if value is not OMITTED:
+                projection.append(value)
+        return projection
+    elif include is None:
+        return data
+    return OMITTED
+
+def iter_paths(stream, paths, Loader=SafeLoader):
+    """
+    Parse all YAML documents in a stream and produce
+    (keys, object) pairs for the nodes matching any of `paths`.
+    """
+    paths = [tuple(path) for path in paths]
+    loader = Loader(stream)
+    try:
+        selector = PathSelector(loader)
+        while loader.check_node():
+            yield from selector.select_document(paths)
+    finally:
+        loader.dispose()
+
+def iter_path(stream, path, Loader=SafeLoader):
+    """
+    Parse all YAML documents in a stream and produce
+    (keys, object) pairs for the nodes matching `path`.
+    """
+    return iter_paths(stream, [path], Loader)
+
+def load_projection(stream, Loader=SafeLoader, include=None, exclude=None):
+    """
+    Parse the first YAML document in a stream and produce
+    the corresponding Python object restricted to the
+    `include` paths and without the `exclude` paths.
+    """
+    if include is not None:
+        include = [tuple(path) for path in include]
+    exclude = [tuple(path) for path in exclude or []]
+    loader = Loader(stream)
+    try:
+        return PathSelector(loader).project_single_document(include, exclude)
+    finally:
+        loader.dispose()
@@ -7,19 +7,27 @@
 # It's just a record and its only use is producing nice error messages.
 # Parser does not use it for any other purposes.
 #
+#   LazyMark(source, index)
+# A Mark for an input that is kept in memory as a whole. It records only
+# the position; the line and the column are computed on first access.
+#
 #   Reader(source, data)
 # Reader determines the encoding of `data` and converts it to unicode.
+# A path-like `data` is memory-mapped and decoded lazily in large windows.
 # Reader provides the following methods and attributes:
 #   reader.peek(length=1) - return the next `length` characters
 #   reader.forward(length=1) - move the current position to `length` characters.
+#   reader.match_length(regexp) - the length of the `regexp` match at the current position.
 #   reader.index - the number of the current character.
 #   reader.line, stream.column - the line and the column of the current character.
+# Only the position is tracked as the reader moves; the line and the column
+# are computed on demand from an index of line breaks in the buffer.
 
 __all__ = ['Reader', 'ReaderError']
 
-from .error import YAMLError, Mark
+from .error import YAMLError, Mark, SlotState
 
-import codecs, re
+import bisect, codecs, mmap, os, re
 
 class ReaderError(YAMLError):
 
@@ -42,6 +50,56 @@ class ReaderError(YAMLError):
                     % (self.character, self.reason,
                             self.name, self.position)
 
+class MarkSource(SlotState):
+    # The input shared by the lazy marks of a Reader.
+
+    __slots__ = ('name', 'buffer', 'line_breaks', 'has_bom')
+
+    def __init__(self, name, buffer):
+        self.name = name
+        self.buffer = buffer
+        self.line_breaks = None
+        self.has_bom = '\uFEFF' in buffer
+
+    def locate(self, pointer):
+        # The line is the number of line breaks before the pointer.
+        if self.line_breaks is None:
+            self.line_breaks = [match.start()
+                    for match in Reader.LINE_BREAK.finditer(self.buffer)]
+        line = bisect.bisect_left(self.line_breaks, pointer)
+        start = self.line_breaks[line-1]+1 if line else 0
+        column = pointer-start
+        if self.has_bom:
+            column -= self.buffer.count('\uFEFF', start, pointer)
+        return line, column
+
+class LazyMark(Mark):
+
+    __slots__ = ('source', 'position')
+
+    def __init__(self, source, index):
+        self.name = source.name
+        self.index = index
+        self.buffer = source.buffer
+        self.pointer = index
+        self.source = source
+        self.position = None
+
+    def __reduce__(self):
+        return LazyMark, (self.source, self.index)
+
+    @property
+    def line(self):
+        if self.position is None:
+            self.position = self.source.locate(self.index)
+        return self.position[0]
+
+    @property
+    def column(self):
+        if self.position is None:
+            self.position = self.source.locate(self.index)
+        return self.position[1]
+
 class Reader(object):
     # Reader:
     # - determines the data encoding and converts it to a unicode string,
@@ -52,10 +110,17 @@ class Reader(object):
     #  - a `bytes` object,
     #  - a `str` object,
     #  - a file-like object with its `read` method returning `str`,
-    #  - a file-like object with its `read` method returning `unicode`.
+    #  - a file-like object with its `read` method returning `unicode`,
+    #  - a path-like object naming a file; the file is memory-mapped and
+    #    decoded in windows of `MMAP_WINDOW` bytes without copying it.
 
     # Yeah, it's ugly and slow.
 
+    MMAP_WINDOW = 1024*1024
+
+    # Produce lazy marks for `str` and `bytes` inputs.
+    LAZY_MARKS = True
+
     def __init__(self, stream):
         self.name = None
         self.stream = None
@@ -64,11 +129,17 @@ class Reader(object):
         self.buffer = ''
         self.pointer = 0
         self.raw_buffer = None
+        self.raw_view = None
         self.raw_decode = None
         self.encoding = None
         self.index = 0
-        self.line = 0
-        self.column = 0
+        self.line_breaks = None
+        self.has_bom = False
+        self.mark_pointer = 0
+        self.mark_breaks = 0
+        self.mark_line = 0
+        self.mark_column = 0
+        self.mark_source = None
         if isinstance(stream, str):
             self.name = "<unicode string>"
             self.check_printable(stream)
@@ -77,6 +148,17 @@ class Reader(object):
             self.name = "<byte string>"
             self.raw_buffer = stream
             self.determine_encoding()
+        elif isinstance(stream, os.PathLike):
+            self.stream = stream
+            self.name = os.fspath(stream)
+            self.eof = False
+            self.raw_view = self.map_file(self.name)
+            try:
+                self.determine_encoding()
+            except BaseException:
+                # There is no loader to dispose of yet.
+                self.unmap_file()
+                raise
         else:
             self.stream = stream
             self.name = getattr(stream, 'name', "<file>")
@@ -96,37 +178,94 @@ class Reader(object):
             self.update(length)
         return self.buffer[self.pointer:self.pointer+length]
 
+    def match_length(self, regexp):
+        # `regexp` must match the empty string and must not match '\0'.
+        # A match running into the end of the buffer may continue in the
+        # data that is not decoded yet, so we extend the buffer and retry.
+        while True:
+            end = regexp.match(self.buffer, self.pointer).end()
+            if end < len(self.buffer) or self.raw_buffer is None:
+                return end-self.pointer
+            self.update(end-self.pointer+1)
+
     def forward(self, length=1):
         if self.pointer+length+1 >= len(self.buffer):
             self.update(length+1)
-        while length:
-            ch = self.buffer[self.pointer]
-            self.pointer += 1
-            self.index += 1
-            if ch in '\n\x85\u2028\u2029'  \
-                    or (ch == '\r' and self.buffer[self.pointer] != '\n'):
-                self.line += 1
-                self.column = 0
-            elif ch != '\uFEFF':
-                self.column += 1
-            length -= 1
+        self.pointer += length
+        self.index += length
+
+    # A line break is '\n', '\x85', '\u2028', '\u2029' or '\r' that is not
+    # followed by '\n'.  The byte order mark does not take a column.
+    LINE_BREAK = re.compile('\r(?!\n)|[\n\x85\u2028\u2029]')
+
+    def index_line_breaks(self):
+        # Offsets of all line breaks in the buffer, followed by a sentinel.
+        self.line_breaks = [match.start()
+                for match in self.LINE_BREAK.finditer(self.buffer)]
+        self.line_breaks.append(len(self.buffer))
+        self.has_bom = '\uFEFF' in self.buffer
+
+    def locate(self):
+        # Return the line and the column of the current character.  The
+        # pointer only moves forward, so we continue from the last position
+        # we have located rather than from the beginning of the buffer.
+        pointer = self.pointer
+        if pointer == self.mark_pointer:
+            return self.mark_line, self.mark_column
+        if self.line_breaks is None:
+            self.index_line_breaks()
+        if pointer <= self.line_breaks[self.mark_breaks]:
+            self.mark_column += pointer-self.mark_pointer
+            if self.has_bom:
+                self.mark_column -= self.buffer.count('\uFEFF',
+                        self.mark_pointer, pointer)
+        else:
+            breaks = bisect.bisect_left(self.line_breaks, pointer,
+                    self.mark_breaks)
+            start = self.line_breaks[breaks-1]+1
+            self.mark_line += breaks-self.mark_breaks
+            self.mark_column = pointer-start
+            if self.has_bom:
+                self.mark_column -= self.buffer.count('\uFEFF', start, pointer)
+            self.mark_breaks = breaks
+        self.mark_pointer = pointer
+        return self.mark_line, self.mark_column
+
+    @property
+    def line(self):
+        if self.pointer == self.mark_pointer:
+            return self.mark_line
+        return self.locate()[0]
+
+    @property
+    def column(self):
+        if self.pointer == self.mark_pointer:
+            return self.mark_column
+        return self.locate()[1]
 
     def get_mark(self):
+        if self.stream is None and self.LAZY_MARKS:
+            # The buffer holds the whole input, so the position is enough.
+            if self.mark_source is None:
+                self.mark_source = MarkSource(self.name, self.buffer)
+            return LazyMark(self.mark_source, self.index)
+        line, column = self.locate()
         if self.stream is None:
-            return Mark(self.name, self.index, self.line, self.column,
+            return Mark(self.name, self.index, line, column,
                     self.buffer, self.pointer)
         else:
-            return Mark(self.name, self.index, self.line, self.column,
+            return Mark(self.name, self.index, line, column,
                     None, None)
 
     def determine_encoding(self):
         while not self.eof and (self.raw_buffer is None or len(self.raw_buffer) < 2):
             self.update_raw()
-        if isinstance(self.raw_buffer, bytes):
-            if self.raw_buffer.startswith(codecs.BOM_UTF16_LE):
+        if not isinstance(self.raw_buffer, str):
+            bom = bytes(self.raw_buffer[:2])
+            if bom == codecs.BOM_UTF16_LE:
                 self.raw_decode = codecs.utf_16_le_decode
                 self.encoding = 'utf-16-le'
-            elif self.raw_buffer.startswith(codecs.BOM_UTF16_BE):
+            elif bom == codecs.BOM_UTF16_BE:
                 self.raw_decode = codecs.utf_16_be_decode
                 self.encoding = 'utf-16-be'
             else:
@@ -135,20 +274,33 @@ class Reader(object):
         self.update(1)
 
     NON_PRINTABLE = re.compile('[^\x09\x0A\x0D\x20-\x7E\x85\xA0-\uD7FF\uE000-\uFFFD\U00010000-\U0010ffff]')
-    def check_printable(self, data):
+    def check_printable(self, data, offset=0):
+        # `offset` is the number of decoded characters that precede `data`
+        # but are not in the buffer yet.
         match = self.NON_PRINTABLE.search(data)
         if match:
             character = match.group()
-            position = self.index+(len(self.buffer)-self.pointer)+match.start()
+            position = self.index+(len(self.buffer)-self.pointer)+offset+match.start()
             raise ReaderError(self.name, position, ord(character),
                     'unicode', "special characters are not allowed")
 
     def update(self, length):
         if self.raw_buffer is None:
             return
+        # Keep the unconsumed tail and decode at least as many new characters
+        # as it holds, joining everything once at the end.  A long token is
+        # then copied a bounded number of times instead of once per raw chunk,
+        # so refilling stays linear in the size of the stream.
+        self.locate()
         self.buffer = self.buffer[self.pointer:]
         self.pointer = 0
-        while len(self.buffer) < length:
+        self.line_breaks = None
+        self.mark_pointer = 0
+        self.mark_breaks = 0
+        chunks = [self.buffer]
+        size = len(self.buffer)
+        length = max(length, 2*size)
+        while size < length:
             if not self.eof:
                 self.update_raw()
             if self.raw_decode is not None:
@@ -166,15 +318,63 @@ class Reader(object):
             else:
                 data = self.raw_buffer
                 converted = len(data)
-            self.check_printable(data)
-            self.buffer += data
+            self.check_printable(data, size-len(self.buffer))
+            chunks.append(data)
+            size += len(data)
             self.raw_buffer = self.raw_buffer[converted:]
             if self.eof:
-                self.buffer += '\0'
+                chunks.append('\0')
                 self.raw_buffer = None
+                if self.raw_view is not None:
+                    self.unmap_file()
                 break
+        self.buffer = ''.join(chunks)
+
+    def map_file(self, path):
+        # Map the whole file read-only.  Files that cannot be mapped (empty
+        # files, pipes and other special files) are read into memory instead.
+        with open(path, 'rb') as file:
+            try:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                data = file.read()
+        return memoryview(data)
+
+    def unmap_file(self):
+        # Release the views of the mapped file and close the mapping, so
+        # that it does not wait for the garbage collector. A mapping with
+        # views still in use elsewhere is left to it.
+        if isinstance(self.raw_buffer, memoryview):
+            self.raw_buffer.release()
+            self.raw_buffer = None
+        data = self.raw_view.obj
+        self.raw_view.release()
+        self.raw_view = None
+        if isinstance(data, mmap.mmap):
+            try:
+                data.close()
+            except BufferError:
+                pass
+
+    def dispose(self):
+        # Unmap a file that has not been read to its end.
+        if self.raw_view is not None:
+            self.unmap_file()
 
     def update_raw(self, size=4096):
+        if self.raw_view is not None:
+            # The raw buffer is always a contiguous slice of the mapped file,
+            # so extending it is just moving the end of the slice.
+            start = self.stream_pointer
+            if self.raw_buffer is not None:
+                start -= len(self.raw_buffer)
+            end = min(self.stream_pointer+max(size, self.MMAP_WINDOW),
+                    len(self.raw_view))
+            self.raw_buffer = self.raw_view[start:end]
+            self.stream_pointer = end
+            if end == len(self.raw_view):
+                self.eof = True
+            return
         data = self.stream.read(size)
         if self.raw_buffer is None:
             self.raw_buffer = data
@@ -4,11 +4,39 @@ __all__ = ['BaseResolver', 'Resolver']
 from .error import *
 from .nodes import *
 
-import re
+import functools, re
 
 class ResolverError(YAMLError):
     pass
 
+class PathResolverState:
+    # A state of the automaton that the path resolvers are compiled into.
+    # `prefix_paths` are the paths that match the nodes from the root to
+    # the current node and continue below it, and `exact_paths` are the
+    # tags of the paths that end at the current node. `transitions` maps
+    # the current node and the index of a child to the state of the child,
+    # and is filled as the children are met; it is None if the transitions
+    # cannot be kept.
+
+    __slots__ = ['depth', 'prefix_paths', 'exact_paths', 'index_checks',
+            'transitions']
+
+    def __init__(self, depth, prefix_paths, exact_paths, transitions):
+        self.depth = depth
+        self.prefix_paths = prefix_paths
+        self.exact_paths = exact_paths
+        # The string and integer indices that the next step checks.
+        self.index_checks = {path[depth][1] for path, kind in prefix_paths
+                if isinstance(path[depth][1], (str, int))
+                    and not isinstance(path[depth][1], bool)}
+        self.transitions = transitions
+
+# The index of a child that no string or integer index check matches.
+ANY_INDEX = object()
+
+# The state below the nodes where no path continues.
+NO_PATHS = PathResolverState(0, [], {}, None)
+
 class BaseResolver:
 
     DEFAULT_SCALAR_TAG = 'tag:yaml.org,2002:str'
@@ -18,9 +46,21 @@ class BaseResolver:
     yaml_implicit_resolvers = {}
     yaml_path_resolvers = {}
 
+    # The implicit resolvers compiled by `compile_implicit_resolvers`.
+    yaml_implicit_regexps = None
+
+    # The path resolvers compiled by `compile_path_resolvers`.
+    yaml_path_automaton = None
+
+    # The number of plain scalars whose implicit tags each resolver class
+    # keeps, and the length of the longest one kept.
+    yaml_resolve_cache_size = 4096
+    yaml_resolve_cache_length = 128
+
     def __init__(self):
-        self.resolver_exact_paths = []
-        self.resolver_prefix_paths = []
+        self.resolver_states = []
+        self.implicit_match, self.implicit_cache =  \
+                self.compile_implicit_resolvers()
 
     @classmethod
     def add_implicit_resolver(cls, tag, regexp, first):
@@ -33,6 +73,103 @@ class BaseResolver:
             first = [None]
         for ch in first:
             cls.yaml_implicit_resolvers.setdefault(ch, []).append((tag, regexp))
+        cls.yaml_implicit_regexps = None
+
+    @classmethod
+    def compile_implicit_resolvers(cls):
+        # Combine the implicit resolvers of each first character, followed
+        # by the resolvers for any character, into a single regexp with a
+        # named group for each resolver, so that a scalar is resolved with
+        # one match. The alternatives are tried in order, as the resolvers
+        # are. Regexps that cannot be combined, such as those with groups
+        # of their own or with flags other than verbose ones, are tried on
+        # their own in between.
+        # The result is kept with a copy of `yaml_implicit_resolvers`, so
+        # that it is compiled again if the resolvers are changed directly.
+        # Return a function that matches a scalar against the resolvers and
+        # the same function with a bounded LRU cache of its results, which
+        # is shared by the loaders and dumpers of the class.
+        cached = cls.__dict__.get('yaml_implicit_regexps')
+        if cached is not None and cached[0] == cls.yaml_implicit_resolvers  \
+                and cached[1] == cls.yaml_resolve_cache_size:
+            return cached[2]
+        resolvers = {ch: cls.yaml_implicit_resolvers[ch][:]
+                for ch in cls.yaml_implicit_resolvers}
+        wildcard_resolvers = resolvers.get(None, [])
+        regexps = {}
+        for ch in resolvers:
+            if ch is not None:
+                regexps[ch] = cls.combine_implicit_resolvers(
+                        resolvers[ch]+wildcard_resolvers)
+        regexps[None] = cls.combine_implicit_resolvers(wildcard_resolvers)
+        match = functools.partial(cls.match_implicit_resolvers, regexps)
+        cache = functools.lru_cache(cls.yaml_resolve_cache_size)(match)
+        cls.yaml_implicit_regexps = (resolvers, cls.yaml_resolve_cache_size,
+                (match, cache))
+        return match, cache
+
+    @classmethod
+    def resolve_cache_info(cls):
+        # Return the hits, misses, maximum and current size of the cache
+        # of implicit tags, as `functools.lru_cache` does.
+        match, cache = cls.compile_implicit_resolvers()
+        return cache.cache_info()
+
+    @staticmethod
+    def match_implicit_resolvers(regexps, value):
+        # Return the tag of the first implicit resolver matching the value,
+        # or None.
+        for regexp, tags in regexps.get(value[:1]) or regexps[None]:
+            match = regexp.match(value)
+            if match is not None:
+                if isinstance(tags, dict):
+                    return tags[match.lastgroup]
+                return tags
+        return None
+
+    @staticmethod
+    def combine_implicit_resolvers(resolvers):
+        # Return a list of regexps to be tried in order, each with a dict
+        # from its group names to the tags, or with the tag of the single
+        # resolver it belongs to if the resolver is tried on its own.
+        steps = []
+        alternatives = []
+        tags = {}
+        for tag, regexp in resolvers:
+            alternative = None
+            if isinstance(regexp, re.Pattern)   \
+                    and isinstance(regexp.pattern, str) \
+                    and not regexp.groups:
+                name = 'r%d' % len(alternatives)
+                if not regexp.flags & ~re.U:
+                    alternative = '(?P<%s>%s)' % (name, regexp.pattern)
+                elif regexp.flags & re.X   \
+                        and not regexp.flags & ~(re.I|re.M|re.S|re.X|re.U):
+                    flags = ''.join(flag for flag, value
+                            in [('i', re.I), ('m', re.M), ('s', re.S),
+                                ('x', re.X)]
+                            if regexp.flags & value)
+                    # A comment of a verbose regexp ends with the line.
+                    alternative = '(?P<%s>(?%s:%s\n))'    \
+                            % (name, flags, regexp.pattern)
+            if alternative is not None:
+                try:
+                    re.compile(alternative)
+                except re.error:
+                    # E.g. global flags in the pattern itself.
+                    alternative = None
+            if alternative is not None:
+                alternatives.append(alternative)
+                tags[name] = tag
+                continue
+            if alternatives:
+                steps.append((re.compile('|'.join(alternatives)), tags))
+                alternatives = []
+                tags = {}
+            steps.append((regexp, tag))
+        if alternatives:
+            steps.append((re.compile('|'.join(alternatives)), tags))
+        return steps
 
     @classmethod
     def add_path_resolver(cls, tag, path, kind=None):
@@ -87,35 +224,80 @@ class BaseResolver:
                 and kind is not None:
             raise ResolverError("Invalid node kind: %s" % kind)
         cls.yaml_path_resolvers[tuple(new_path), kind] = tag
+        cls.yaml_path_automaton = None
+
+    @classmethod
+    def compile_path_resolvers(cls):
+        # Return the root state of the automaton of the path resolvers. The
+        # other states are added as `descend_resolver` meets them, so that
+        # a step down the tree is a single lookup in `transitions` once the
+        # step has been taken. The transitions depend only on the kind and
+        # tag of the current node and on the index, so they are not kept if
+        # `check_resolver_prefix` is overridden. As with the implicit
+        # resolvers, the automaton is kept with a copy of the resolvers.
+        cached = cls.__dict__.get('yaml_path_automaton')
+        if cached is not None and cached[0] == cls.yaml_path_resolvers:
+            return cached[1]
+        keep = cls.check_resolver_prefix is BaseResolver.check_resolver_prefix
+        exact_paths = {}
+        prefix_paths = []
+        for path, kind in cls.yaml_path_resolvers:
+            if not path:
+                exact_paths[kind] = cls.yaml_path_resolvers[path, kind]
+            else:
+                prefix_paths.append((path, kind))
+        root = PathResolverState(0, prefix_paths, exact_paths,
+                {} if keep else None)
+        cls.yaml_path_automaton = (cls.yaml_path_resolvers.copy(), root)
+        return root
 
     def descend_resolver(self, current_node, current_index):
         if not self.yaml_path_resolvers:
             return
+        if not current_node:
+            self.resolver_states.append(self.compile_path_resolvers())
+            return
+        state = self.resolver_states[-1]
+        if not state.prefix_paths:
+            self.resolver_states.append(NO_PATHS)
+            return
+        transitions = state.transitions
+        if transitions is not None:
+            if current_index is None:
+                index = None
+            elif isinstance(current_index, ScalarNode):
+                index = current_index.value
+                if index not in state.index_checks:
+                    index = ANY_INDEX
+            elif isinstance(current_index, int)    \
+                    and current_index in state.index_checks:
+                index = current_index
+            else:
+                index = ANY_INDEX
+            key = (current_node.__class__, current_node.tag, index)
+            if key in transitions:
+                self.resolver_states.append(transitions[key])
+                return
         exact_paths = {}
         prefix_paths = []
-        if current_node:
-            depth = len(self.resolver_prefix_paths)
-            for path, kind in self.resolver_prefix_paths[-1]:
-                if self.check_resolver_prefix(depth, path, kind,
-                        current_node, current_index):
-                    if len(path) > depth:
-                        prefix_paths.append((path, kind))
-                    else:
-                        exact_paths[kind] = self.yaml_path_resolvers[path, kind]
-        else:
-            for path, kind in self.yaml_path_resolvers:
-                if not path:
-                    exact_paths[kind] = self.yaml_path_resolvers[path, kind]
-                else:
+        depth = state.depth+1
+        for path, kind in state.prefix_paths:
+            if self.check_resolver_prefix(depth, path, kind,
+                    current_node, current_index):
+                if len(path) > depth:
                     prefix_paths.append((path, kind))
-        self.resolver_exact_paths.append(exact_paths)
-        self.resolver_prefix_paths.append(prefix_paths)
+                else:
+                    exact_paths[kind] = self.yaml_path_resolvers[path, kind]
+        child = PathResolverState(depth, prefix_paths, exact_paths,
+                {} if transitions is not None else None)
+        if transitions is not None:
+            transitions[key] = child
+        self.resolver_states.append(child)
 
     def ascend_resolver(self):
         if not self.yaml_path_resolvers:
             return
-        self.resolver_exact_paths.pop()
-        self.resolver_prefix_paths.pop()
+        self.resolver_states.pop()
 
     def check_resolver_prefix(self, depth, path, kind,
             current_node, current_index):
@@ -142,17 +324,15 @@ class BaseResolver:
 
     def resolve(self, kind, value, implicit):
         if kind is ScalarNode and implicit[0]:
-            if value == '':
-                resolvers = self.yaml_implicit_resolvers.get('', [])
+            if len(value) <= self.yaml_resolve_cache_length:
+                tag = self.implicit_cache(value)
             else:
-                resolvers = self.yaml_implicit_resolvers.get(value[0], [])
-            wildcard_resolvers = self.yaml_implicit_resolvers.get(None, [])
-            for tag, regexp in resolvers + wildcard_resolvers:
-                if regexp.match(value):
-                    return tag
+                tag = self.implicit_match(value)
+            if tag is not None:
+                return tag
             implicit = implicit[1]
         if self.yaml_path_resolvers:
-            exact_paths = self.resolver_exact_paths[-1]
+            exact_paths = self.resolver_states[-1].exact_paths
             if kind in exact_paths:
                 return exact_paths[kind]
             if None in exact_paths:
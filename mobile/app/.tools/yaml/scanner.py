@@ -29,6 +29,8 @@ __all__ = ['Scanner', 'ScannerError']
 from .error import MarkedYAMLError
 from .tokens import *
 
+import collections, re
+
 class ScannerError(MarkedYAMLError):
     pass
 
@@ -45,6 +47,31 @@ class SimpleKey:
 
 class Scanner:
 
+    # Runs of characters that the scanners consume in a single step through
+    # `match_length`.  Each scanner still examines the character that ends
+    # the run the same way as it would if it went one character at a time.
+    SPACES = re.compile(' *')
+    WHITESPACES = re.compile('[ \t]*')
+    NON_BREAKS = re.compile('[^\0\r\n\x85\u2028\u2029]*')
+    FLOW_SCALAR_NON_SPACES = re.compile('[^\'\"\\\\\0 \t\r\n\x85\u2028\u2029]*')
+    # A plain scalar stops at a blank, at ':' followed by a blank, and, in
+    # the flow context, at ',', '?', '[', ']', '{', '}' and at ':' followed
+    # by ',', '[', ']', '{', '}'.
+    BLOCK_PLAIN = re.compile('[^\0 \t\r\n\x85\u2028\u2029:]*'
+            '(?::(?![\0 \t\r\n\x85\u2028\u2029])[^\0 \t\r\n\x85\u2028\u2029:]*)*')
+    FLOW_PLAIN = re.compile('[^\0 \t\r\n\x85\u2028\u2029:,?\\[\\]{}]*'
+            '(?::(?![\0 \t\r\n\x85\u2028\u2029,\\[\\]{}])'
+            '[^\0 \t\r\n\x85\u2028\u2029:,?\\[\\]{}]*)*')
+    # A single line plain scalar followed by ':' and a blank, as a simple
+    # key in the block context. The words of the key are separated by spaces
+    # and do not start with '#' or ':'. It matches nothing if the line is
+    # anything else.
+    SIMPLE_KEY = re.compile('(?:%s(?: +(?![\0 \t\r\n\x85\u2028\u2029#:])%s)*'
+            ' *:(?=[\0 \t\r\n\x85\u2028\u2029]))?'
+            % (BLOCK_PLAIN.pattern, BLOCK_PLAIN.pattern))
+    # ':' and the spaces after it.
+    VALUE = re.compile(': *')
+
     def __init__(self):
         """Initialize the scanner."""
         # It is assumed that Scanner and Reader will have a common descendant.
@@ -63,8 +90,11 @@ class Scanner:
         # context.
         self.flow_level = 0
 
-        # List of processed tokens that are not yet emitted.
-        self.tokens = []
+        # Queue of processed tokens that are not yet emitted.
+        self.tokens = collections.deque()
+
+        # The fetchers of the first characters of tokens.
+        self.init_fetchers()
 
         # Add the STREAM-START token.
         self.fetch_stream_start()
@@ -106,6 +136,10 @@ class Scanner:
         #   (token_number, required, index, line, column, mark)
         # A simple key may start with ALIAS, ANCHOR, TAG, SCALAR(flow),
         # '[', or '{' tokens.
+        # A key is only saved or removed at the current flow level, and the
+        # key of a level is removed before the level is closed. So the
+        # dictionary is a stack: its insertion order is the order of flow
+        # levels, token numbers and positions alike.
         self.possible_simple_keys = {}
 
     # Public methods.
@@ -138,7 +172,7 @@ class Scanner:
             self.fetch_more_tokens()
         if self.tokens:
             self.tokens_taken += 1
-            return self.tokens.pop(0)
+            return self.tokens.popleft()
 
     # Private methods.
 
@@ -165,90 +199,97 @@ class Scanner:
         # and decrease the current indentation level.
         self.unwind_indent(self.column)
 
-        # Peek the next character.
-        ch = self.peek()
+        # TODO: support for BOM within a stream.
+        #if ch == '\uFEFF':
+        #    return self.fetch_bom()    <-- issue BOMToken
 
-        # Is it the end of stream?
-        if ch == '\0':
-            return self.fetch_stream_end()
+        # Peek the next character and dispatch on it. Any character that is
+        # not in the table starts a plain scalar.
+        fetcher = self.fetchers.get(self.peek())
+        if fetcher is None:
+            return self.fetch_plain()
+        return fetcher(self)
+
+    # The fetchers for the characters that may start a token other than a
+    # plain scalar. Indicators that start a token only in some positions
+    # are checked by their fetchers, which fall back to `fetch_other`.
+    # The names are resolved into `fetchers` once per class, so subclasses
+    # may override any of the fetchers.
+    FETCHER_NAMES = {
+        '\0': 'fetch_stream_end',
+        '%': 'fetch_percent',
+        '-': 'fetch_dash',
+        '.': 'fetch_dot',
+        '[': 'fetch_flow_sequence_start',
+        '{': 'fetch_flow_mapping_start',
+        ']': 'fetch_flow_sequence_end',
+        '}': 'fetch_flow_mapping_end',
+        ',': 'fetch_flow_entry',
+        '?': 'fetch_question',
+        ':': 'fetch_colon',
+        '*': 'fetch_alias',
+        '&': 'fetch_anchor',
+        '!': 'fetch_tag',
+        '|': 'fetch_pipe',
+        '>': 'fetch_greater',
+        '\'': 'fetch_single',
+        '\"': 'fetch_double',
+    }
+    FETCHER_NAMES.update(dict.fromkeys(' \t\r\n\x85\u2028\u2029#@`',
+            'fetch_other'))
 
+    @classmethod
+    def init_fetchers(cls):
+        if not 'fetchers' in cls.__dict__:
+            cls.fetchers = {ch: getattr(cls, name)
+                    for ch, name in cls.FETCHER_NAMES.items()}
+
+    def fetch_percent(self):
         # Is it a directive?
-        if ch == '%' and self.check_directive():
+        if self.check_directive():
             return self.fetch_directive()
+        return self.fetch_other()
 
+    def fetch_dash(self):
         # Is it the document start?
-        if ch == '-' and self.check_document_start():
+        if self.check_document_start():
             return self.fetch_document_start()
+        # Is it the block entry indicator?
+        if self.check_block_entry():
+            return self.fetch_block_entry()
+        return self.fetch_other()
 
+    def fetch_dot(self):
         # Is it the document end?
-        if ch == '.' and self.check_document_end():
+        if self.check_document_end():
             return self.fetch_document_end()
+        return self.fetch_other()
 
-        # TODO: support for BOM within a stream.
-        #if ch == '\uFEFF':
-        #    return self.fetch_bom()    <-- issue BOMToken
-
-        # Note: the order of the following checks is NOT significant.
-
-        # Is it the flow sequence start indicator?
-        if ch == '[':
-            return self.fetch_flow_sequence_start()
-
-        # Is it the flow mapping start indicator?
-        if ch == '{':
-            return self.fetch_flow_mapping_start()
-
-        # Is it the flow sequence end indicator?
-        if ch == ']':
-            return self.fetch_flow_sequence_end()
-
-        # Is it the flow mapping end indicator?
-        if ch == '}':
-            return self.fetch_flow_mapping_end()
-
-        # Is it the flow entry indicator?
-        if ch == ',':
-            return self.fetch_flow_entry()
-
-        # Is it the block entry indicator?
-        if ch == '-' and self.check_block_entry():
-            return self.fetch_block_entry()
-
+    def fetch_question(self):
         # Is it the key indicator?
-        if ch == '?' and self.check_key():
+        if self.check_key():
             return self.fetch_key()
+        return self.fetch_other()
 
+    def fetch_colon(self):
         # Is it the value indicator?
-        if ch == ':' and self.check_value():
+        if self.check_value():
             return self.fetch_value()
+        return self.fetch_other()
 
-        # Is it an alias?
-        if ch == '*':
-            return self.fetch_alias()
-
-        # Is it an anchor?
-        if ch == '&':
-            return self.fetch_anchor()
-
-        # Is it a tag?
-        if ch == '!':
-            return self.fetch_tag()
-
+    def fetch_pipe(self):
         # Is it a literal scalar?
-        if ch == '|' and not self.flow_level:
+        if not self.flow_level:
             return self.fetch_literal()
+        return self.fetch_other()
 
+    def fetch_greater(self):
         # Is it a folded scalar?
-        if ch == '>' and not self.flow_level:
+        if not self.flow_level:
             return self.fetch_folded()
+        return self.fetch_other()
 
-        # Is it a single quoted scalar?
-        if ch == '\'':
-            return self.fetch_single()
-
-        # Is it a double quoted scalar?
-        if ch == '\"':
-            return self.fetch_double()
+    def fetch_other(self):
 
         # It must be a plain scalar then.
         if self.check_plain():
@@ -256,25 +297,17 @@ class Scanner:
 
         # No? It's an error. Let's produce a nice error message.
         raise ScannerError("while scanning for the next token", None,
-                "found character %r that cannot start any token" % ch,
+                "found character %r that cannot start any token" % self.peek(),
                 self.get_mark())
 
     # Simple keys treatment.
 
     def next_possible_simple_key(self):
-        # Return the number of the nearest possible simple key. Actually we
-        # don't need to loop through the whole dictionary. We may replace it
-        # with the following code:
-        #   if not self.possible_simple_keys:
-        #       return None
-        #   return self.possible_simple_keys[
-        #           min(self.possible_simple_keys.keys())].token_number
-        min_token_number = None
-        for level in self.possible_simple_keys:
-            key = self.possible_simple_keys[level]
-            if min_token_number is None or key.token_number < min_token_number:
-                min_token_number = key.token_number
-        return min_token_number
+        # Return the number of the nearest possible simple key. The keys are
+        # ordered by token number, so it is the first one.
+        for key in self.possible_simple_keys.values():
+            return key.token_number
+        return None
 
     def stale_possible_simple_keys(self):
         # Remove entries that are no longer possible simple keys. According to
@@ -283,14 +316,21 @@ class Scanner:
         # - should be no longer than 1024 characters.
         # Disabling this procedure will allow simple keys of any length and
         # height (may cause problems if indentation is broken though).
-        for level in list(self.possible_simple_keys):
-            key = self.possible_simple_keys[level]
-            if key.line != self.line  \
-                    or self.index-key.index > 1024:
-                if key.required:
-                    raise ScannerError("while scanning a simple key", key.mark,
-                            "could not find expected ':'", self.get_mark())
-                del self.possible_simple_keys[level]
+        # The keys are ordered by position, so the stale ones come first and
+        # we stop at the first key that is still possible.
+        if not self.possible_simple_keys:
+            return
+        line = self.line
+        stale_levels = []
+        for level, key in self.possible_simple_keys.items():
+            if key.line == line and self.index-key.index <= 1024:
+                break
+            if key.required:
+                raise ScannerError("while scanning a simple key", key.mark,
+                        "could not find expected ':'", self.get_mark())
+            stale_levels.append(level)
+        for level in stale_levels:
+            del self.possible_simple_keys[level]
 
     def save_possible_simple_key(self):
         # The next token may start a simple key. We check if it's possible
@@ -678,6 +718,62 @@ class Scanner:
         # Scan and add SCALAR. May change `allow_simple_key`.
         self.tokens.append(self.scan_plain())
 
+    # The fast path of the parser for the entries `key: value` of a block
+    # mapping. It scans the entries without producing the tokens
+    #   KEY SCALAR(key) VALUE SCALAR(value)
+    # or, if the value is a block mapping on the next lines,
+    #   KEY SCALAR(key) VALUE BLOCK-MAPPING-START
+    # and leaves the scanner in the same state as these tokens would. A key
+    # is a plain scalar on a single line; a value is a plain or quoted scalar
+    # starting on the line of the key. Anything else is left to
+    # `fetch_more_tokens`.
+
+    def scan_block_mapping_key(self):
+        # Return the value and the marks of the key, or None if the next
+        # tokens are not KEY SCALAR VALUE.
+        if self.tokens or self.flow_level or self.possible_simple_keys:
+            return None
+        self.scan_to_next_token()
+        if self.column != self.indent or not self.check_simple_key():
+            return None
+        self.tokens_taken += 2
+        return self.scan_plain_value()
+
+    def scan_block_mapping_value(self):
+        # The scanner is at ':' after a key from `scan_block_mapping_key`.
+        # Return the value of a scalar as (value, start_mark, end_mark,
+        # style), or the mark of the first key of a block mapping, or add
+        # VALUE and return None.
+        length = self.match_length(self.VALUE)
+        ch = self.peek(length)
+        if ch == '\'' or ch == '\"':
+            self.forward(length)
+            self.tokens_taken += 2
+            return self.scan_flow_scalar_value(ch) + (ch,)
+        elif ch not in self.fetchers:
+            self.forward(length)
+            self.tokens_taken += 2
+            return self.scan_plain_value() + (None,)
+        start_mark = self.get_mark()
+        self.forward()
+        end_mark = self.get_mark()
+        self.scan_to_next_token()
+        if self.column > self.indent and self.check_simple_key():
+            self.add_indent(self.column)
+            self.tokens_taken += 2
+            return self.get_mark()
+        self.tokens.append(ValueToken(start_mark, end_mark))
+        return None
+
+    def check_simple_key(self):
+        # Check if the next tokens are KEY SCALAR VALUE with a plain key.
+        if not self.allow_simple_key or self.peek() in self.fetchers:
+            return False
+        # The key must end on this line and within 1024 characters, or it
+        # is not a simple key.
+        length = self.match_length(self.SIMPLE_KEY)
+        return 0 < length <= 1025
+
     # Checkers.
 
     def check_directive(self):
@@ -773,11 +869,9 @@ class Scanner:
             self.forward()
         found = False
         while not found:
-            while self.peek() == ' ':
-                self.forward()
+            self.forward(self.match_length(self.SPACES))
             if self.peek() == '#':
-                while self.peek() not in '\0\r\n\x85\u2028\u2029':
-                    self.forward()
+                self.forward(self.match_length(self.NON_BREAKS))
             if self.scan_line_break():
                 if not self.flow_level:
                     self.allow_simple_key = True
@@ -1005,9 +1099,7 @@ class Scanner:
         while self.column == indent and self.peek() != '\0':
             chunks.extend(breaks)
             leading_non_space = self.peek() not in ' \t'
-            length = 0
-            while self.peek(length) not in '\0\r\n\x85\u2028\u2029':
-                length += 1
+            length = self.match_length(self.NON_BREAKS)
             chunks.append(self.prefix(length))
             self.forward(length)
             line_break = self.scan_line_break()
@@ -1113,7 +1205,7 @@ class Scanner:
                 chunks.append(self.scan_line_break())
                 end_mark = self.get_mark()
             else:
-                self.forward()
+                self.forward(self.match_length(self.SPACES))
                 if self.column > max_indent:
                     max_indent = self.column
         return chunks, max_indent, end_mark
@@ -1122,16 +1214,24 @@ class Scanner:
         # See the specification for details.
         chunks = []
         end_mark = self.get_mark()
-        while self.column < indent and self.peek() == ' ':
-            self.forward()
+        self.scan_block_scalar_indent(indent)
         while self.peek() in '\r\n\x85\u2028\u2029':
             chunks.append(self.scan_line_break())
             end_mark = self.get_mark()
-            while self.column < indent and self.peek() == ' ':
-                self.forward()
+            self.scan_block_scalar_indent(indent)
         return chunks, end_mark
 
+    def scan_block_scalar_indent(self, indent):
+        # Skip the indentation spaces, but no further than `indent`.
+        column = self.column
+        if column < indent:
+            self.forward(min(self.match_length(self.SPACES), indent-column))
+
     def scan_flow_scalar(self, style):
+        value, start_mark, end_mark = self.scan_flow_scalar_value(style)
+        return ScalarToken(value, False, start_mark, end_mark, style)
+
+    def scan_flow_scalar_value(self, style):
         # See the specification for details.
         # Note that we loose indentation rules for quoted scalars. Quoted
         # scalars don't need to adhere indentation because " and ' clearly
@@ -1152,8 +1252,7 @@ class Scanner:
             chunks.extend(self.scan_flow_scalar_non_spaces(double, start_mark))
         self.forward()
         end_mark = self.get_mark()
-        return ScalarToken(''.join(chunks), False, start_mark, end_mark,
-                style)
+        return ''.join(chunks), start_mark, end_mark
 
     ESCAPE_REPLACEMENTS = {
         '0':    '\0',
@@ -1186,9 +1285,7 @@ class Scanner:
         # See the specification for details.
         chunks = []
         while True:
-            length = 0
-            while self.peek(length) not in '\'\"\\\0 \t\r\n\x85\u2028\u2029':
-                length += 1
+            length = self.match_length(self.FLOW_SCALAR_NON_SPACES)
             if length:
                 chunks.append(self.prefix(length))
                 self.forward(length)
@@ -1228,9 +1325,7 @@ class Scanner:
     def scan_flow_scalar_spaces(self, double, start_mark):
         # See the specification for details.
         chunks = []
-        length = 0
-        while self.peek(length) in ' \t':
-            length += 1
+        length = self.match_length(self.WHITESPACES)
         whitespaces = self.prefix(length)
         self.forward(length)
         ch = self.peek()
@@ -1268,6 +1363,10 @@ class Scanner:
                 return chunks
 
     def scan_plain(self):
+        value, start_mark, end_mark = self.scan_plain_value()
+        return ScalarToken(value, True, start_mark, end_mark)
+
+    def scan_plain_value(self):
         # See the specification for details.
         # We add an additional restriction for the flow context:
         #   plain scalars in the flow context cannot contain ',' or '?'.
@@ -1283,18 +1382,12 @@ class Scanner:
         #    indent = 1
         spaces = []
         while True:
-            length = 0
             if self.peek() == '#':
                 break
-            while True:
-                ch = self.peek(length)
-                if ch in '\0 \t\r\n\x85\u2028\u2029'    \
-                        or (ch == ':' and
-                                self.peek(length+1) in '\0 \t\r\n\x85\u2028\u2029'
-                                      + (u',[]{}' if self.flow_level else u''))\
-                        or (self.flow_level and ch in ',?[]{}'):
-                    break
-                length += 1
+            if self.flow_level:
+                length = self.match_length(self.FLOW_PLAIN)
+            else:
+                length = self.match_length(self.BLOCK_PLAIN)
             if length == 0:
                 break
             self.allow_simple_key = False
@@ -1306,16 +1399,14 @@ class Scanner:
             if not spaces or self.peek() == '#' \
                     or (not self.flow_level and self.column < indent):
                 break
-        return ScalarToken(''.join(chunks), True, start_mark, end_mark)
+        return ''.join(chunks), start_mark, end_mark
 
     def scan_plain_spaces(self, indent, start_mark):
         # See the specification for details.
         # The specification is really confusing about tabs in plain scalars.
         # We just forbid them completely. Do not use tabs in YAML!
         chunks = []
-        length = 0
-        while self.peek(length) in ' ':
-            length += 1
+        length = self.match_length(self.SPACES)
         whitespaces = self.prefix(length)
         self.forward(length)
         ch = self.peek()
@@ -1329,7 +1420,7 @@ class Scanner:
             breaks = []
             while self.peek() in ' \r\n\x85\u2028\u2029':
                 if self.peek() == ' ':
-                    self.forward()
+                    self.forward(self.match_length(self.SPACES))
                 else:
                     breaks.append(self.scan_line_break())
                     prefix = self.prefix(3)
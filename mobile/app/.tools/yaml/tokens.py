@@ -1,11 +1,21 @@
 
-class Token(object):
+from . import error
+
+class Token(error.SlotState):
+    __slots__ = ('start_mark', 'end_mark')
     def __init__(self, start_mark, end_mark):
         self.start_mark = start_mark
         self.end_mark = end_mark
     def __repr__(self):
-        attributes = [key for key in self.__dict__
-                if not key.endswith('_mark')]
+        # The attributes are the slots of the token classes and, for
+        # subclasses without __slots__, the instance dictionary.
+        keys = set(getattr(self, '__dict__', ()))
+        for cls in self.__class__.__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            keys.update([slots] if isinstance(slots, str) else slots)
+        attributes = [key for key in keys
+                if not key.endswith('_mark') and not key.startswith('__')
+                    and hasattr(self, key)]
         attributes.sort()
         arguments = ', '.join(['%s=%r' % (key, getattr(self, key))
                 for key in attributes])
@@ -15,6 +25,7 @@ class Token(object):
 #    id = '<byte order mark>'
 
 class DirectiveToken(Token):
+    __slots__ = ('name', 'value')
     id = '<directive>'
     def __init__(self, name, value, start_mark, end_mark):
         self.name = name
@@ -23,12 +34,15 @@ class DirectiveToken(Token):
         self.end_mark = end_mark
 
 class DocumentStartToken(Token):
+    __slots__ = ()
     id = '<document start>'
 
 class DocumentEndToken(Token):
+    __slots__ = ()
     id = '<document end>'
 
 class StreamStartToken(Token):
+    __slots__ = ('encoding',)
     id = '<stream start>'
     def __init__(self, start_mark=None, end_mark=None,
             encoding=None):
@@ -37,42 +51,55 @@ class StreamStartToken(Token):
         self.encoding = encoding
 
 class StreamEndToken(Token):
+    __slots__ = ()
     id = '<stream end>'
 
 class BlockSequenceStartToken(Token):
+    __slots__ = ()
     id = '<block sequence start>'
 
 class BlockMappingStartToken(Token):
+    __slots__ = ()
     id = '<block mapping start>'
 
 class BlockEndToken(Token):
+    __slots__ = ()
     id = '<block end>'
 
 class FlowSequenceStartToken(Token):
+    __slots__ = ()
     id = '['
 
 class FlowMappingStartToken(Token):
+    __slots__ = ()
     id = '{'
 
 class FlowSequenceEndToken(Token):
+    __slots__ = ()
     id = ']'
 
 class FlowMappingEndToken(Token):
+    __slots__ = ()
     id = '}'
 
 class KeyToken(Token):
+    __slots__ = ()
     id = '?'
 
 class ValueToken(Token):
+    __slots__ = ()
     id = ':'
 
 class BlockEntryToken(Token):
+    __slots__ = ()
     id = '-'
 
 class FlowEntryToken(Token):
+    __slots__ = ()
     id = ','
 
 class AliasToken(Token):
+    __slots__ = ('value',)
     id = '<alias>'
     def __init__(self, value, start_mark, end_mark):
         self.value = value
@@ -80,6 +107,7 @@ class AliasToken(Token):
         self.end_mark = end_mark
 
 class AnchorToken(Token):
+    __slots__ = ('value',)
     id = '<anchor>'
     def __init__(self, value, start_mark, end_mark):
         self.value = value
@@ -87,6 +115,7 @@ class AnchorToken(Token):
         self.end_mark = end_mark
 
 class TagToken(Token):
+    __slots__ = ('value',)
     id = '<tag>'
     def __init__(self, value, start_mark, end_mark):
         self.value = value
@@ -94,6 +123,7 @@ class TagToken(Token):
         self.end_mark = end_mark
 
 class ScalarToken(Token):
+    __slots__ = ('value', 'plain', 'style')
     id = '<scalar>'
     def __init__(self, value, plain, start_mark, end_mark, style=None):
         self.value = value
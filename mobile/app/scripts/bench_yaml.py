@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the vendored pure-Python PyYAML in ./.tools.
+
+Each benchmark generates its own input, so no network or vendor checkout is
+needed. Run one benchmark by name, or all of them:
+
+  python bench_yaml.py mmap --size-mb 8
+  python bench_yaml.py all
+"""
+import argparse
+import gc
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.tools')))
+try:
+    import yaml  # type: ignore
+except Exception as e:
+    print("PyYAML not available. Please run: python3 -m pip install pyyaml --target ./.tools", file=sys.stderr)
+    raise
+
+
+def make_spec(size_mb: float) -> str:
+    """Generate an OpenAPI-like YAML document of roughly `size_mb` megabytes."""
+
+    def operation(n: int) -> dict:
+        return {
+            'post': {
+                'tags': ['Resource', f'Group{n % 17}'],
+                'summary': f'Retrieve resource {n}',
+                'operationId': f'resource{n}Get',
+                'deprecated': n % 11 == 0,
+                'description': (f'Returns resource {n} for the given item.\n'
+                                'The response is cached for up to 5 minutes.\n') * 3,
+                'requestBody': {
+                    'required': True,
+                    'content': {'application/json': {'schema': {'$ref': f'#/components/schemas/Resource{n}Request'}}},
+                },
+                'responses': {
+                    '200': {
+                        'description': 'OK',
+                        'content': {'application/json': {'schema': {'$ref': f'#/components/schemas/Resource{n}Response'}}},
+                    },
+                    'default': {
+                        'description': 'Error',
+                        'content': {'application/json': {'schema': {'$ref': '#/components/schemas/Error'}}},
+                    },
+                },
+                'x-rate-limit': [n, n * 2, 1.5, 'per-minute'],
+            },
+        }
+
+    def dump(count: int) -> str:
+        paths = {f'/resource{n}/get': operation(n) for n in range(count)}
+        return yaml.safe_dump({'openapi': '3.0.0', 'info': {'version': '2020-09-14', 'title': 'Bench API'},
+                               'paths': paths}, sort_keys=False, width=80)
+
+    per_operation = len(dump(100)) / 100
+    return dump(max(1, int(size_mb * 1024 * 1024 / per_operation)))
+
+
+def timed(fn, repeat: int = 3) -> float:
+    """Return the best wall-clock time of `repeat` calls to `fn`."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def make_config(size_mb: float) -> str:
+    """Generate a config-style YAML document of roughly `size_mb` megabytes."""
+
+    def service(n: int) -> str:
+        return (f'service{n}:\n'
+                f'  name: service-{n}\n'
+                f'  enabled: {str(n % 2 == 0).lower()}\n'
+                f'  replicas: {n % 5 + 1}\n'
+                f'  image: registry.example.com/service{n}:1.{n % 10}\n'
+                '  ports:\n'
+                f'    - {8000 + n % 1000}\n'
+                f'    - {9000 + n % 1000}\n'
+                '  env:\n'
+                '    LOG_LEVEL: info\n'
+                f'    TIMEOUT: {n % 60}s\n')
+
+    per_service = len(service(1000))
+    return ''.join(service(n) for n in range(max(1, int(size_mb * 1024 * 1024 / per_service))))
+
+
+def bench_marks(args) -> None:
+    # Every token, event and node carries two marks. Compare the eager marks
+    # with the lazy ones that record only a position.
+    text = make_spec(args.size_mb)
+    print(f'marks: yaml.compose over a {len(text) / 1e6:.1f} MB spec')
+    for lazy in (False, True):
+        yaml.reader.Reader.LAZY_MARKS = lazy
+        try:
+            elapsed = timed(lambda: yaml.compose(text, Loader=yaml.SafeLoader), args.repeat)
+            gc.collect()
+            blocks = sys.getallocatedblocks()
+            tracemalloc.start()
+            node = yaml.compose(text, Loader=yaml.SafeLoader)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            gc.collect()
+            retained = sys.getallocatedblocks() - blocks
+            del node
+        finally:
+            yaml.reader.Reader.LAZY_MARKS = True
+        print(f'  {"lazy" if lazy else "eager":<6} {elapsed:8.3f}s  retained blocks {retained:9d}  '
+              f'peak {peak / 1e6:7.1f} MB')
+
+
+MEMORY_CHILD = """
+import gc, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+import yaml
+with open(sys.argv[2], encoding='utf-8') as f:
+    text = f.read()
+gc.collect()
+blocks = sys.getallocatedblocks()
+start = time.perf_counter()
+node = yaml.compose(text, Loader=yaml.SafeLoader)
+elapsed = time.perf_counter() - start
+gc.collect()
+print(elapsed, sys.getallocatedblocks() - blocks, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def bench_memory(args) -> None:
+    # Each size is composed in a fresh process, so that the peak RSS is
+    # that of yaml.compose and not of generating the input.
+    tools = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.tools'))
+    print('memory: yaml.compose over generated specs, one process per size')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'spec.yaml')
+        for size_mb in args.sizes:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(make_spec(size_mb))
+            result = subprocess.run([sys.executable, '-c', MEMORY_CHILD, tools, path],
+                                    check=True, capture_output=True, text=True)
+            elapsed, blocks, maxrss = result.stdout.split()
+            print(f'  {os.path.getsize(path) / 1e6:6.1f} MB  {float(elapsed):8.3f}s  '
+                  f'retained blocks {int(blocks):9d}  peak RSS {int(maxrss) / 1024:7.1f} MB')
+
+
+def bench_mmap(args) -> None:
+    text = make_spec(args.size_mb)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'spec.yaml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        size = os.path.getsize(path)
+
+        def feed(stream):
+            # Drain the reader window by window, the way the scanner does.
+            reader = yaml.reader.Reader(stream)
+            while reader.raw_buffer is not None:
+                reader.pointer = len(reader.buffer)
+                reader.update(1)
+
+        def feed_file():
+            with open(path, 'rb') as f:
+                feed(f)
+
+        def feed_path():
+            feed(pathlib.Path(path))
+
+        def scan_file():
+            with open(path, 'rb') as f:
+                for _ in yaml.scan(f):
+                    pass
+
+        def scan_path():
+            for _ in yaml.scan(pathlib.Path(path)):
+                pass
+
+        def load_file():
+            with open(path, 'rb') as f:
+                yaml.safe_load(f)
+
+        def load_path():
+            yaml.safe_load(pathlib.Path(path))
+
+        print(f'mmap: {size / 1e6:.1f} MB spec')
+        cases = (('feed', feed_file, feed_path), ('scan', scan_file, scan_path), ('safe_load', load_file, load_path))
+        for label, file_fn, path_fn in cases:
+            t_file = timed(file_fn, args.repeat)
+            t_path = timed(path_fn, args.repeat)
+            print(f'  {label:<10} file object {t_file:7.3f}s   path (mmap) {t_path:7.3f}s   '
+                  f'speedup {t_file / t_path:5.2f}x')
+
+
+def bench_scaling(args) -> None:
+    # A streamed file holding one long unbroken scalar (an embedded base64
+    # blob, say) is the worst case for refilling the reader buffer: the
+    # whole token stays unconsumed until its end is found.
+    print('scaling: yaml.scan over a streamed file with one long scalar')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'blob.yaml')
+        for size_mb in args.sizes:
+            with open(path, 'w', encoding='ascii') as f:
+                f.write('blob: ')
+                for _ in range(int(size_mb * 1024)):
+                    f.write('QUJD' * 256)
+                f.write('\n')
+
+            def scan():
+                with open(path, 'rb') as f:
+                    for _ in yaml.scan(f):
+                        pass
+
+            elapsed = timed(scan, args.repeat)
+            print(f'  {size_mb:6g} MB  {elapsed:8.3f}s  {size_mb / elapsed:6.2f} MB/s')
+
+
+def bench_parallel(args) -> None:
+    # A fixture stream of many small documents, loaded sequentially and with
+    # a process pool.
+    doc = make_config(4 / 1024)
+    count = max(1, int(args.size_mb * 1024 * 1024 / len(doc)))
+    text = ''.join(f'--- # fixture {n}\n{doc}' for n in range(count))
+    print(f'parallel: safe_load_all over {count} documents, {len(text) / 1e6:.1f} MB, {os.cpu_count()} CPUs')
+
+    def load(workers):
+        for _ in yaml.safe_load_all(text, workers=workers):
+            pass
+
+    base = timed(lambda: load(None), args.repeat)
+    print(f'  sequential  {base:8.3f}s')
+    for workers in args.workers:
+        elapsed = timed(lambda: load(workers), args.repeat)
+        print(f'  {workers:2d} workers  {elapsed:8.3f}s  speedup {base / elapsed:5.2f}x')
+
+
+def bench_scalars(args) -> None:
+    # Scalar-heavy inputs: a generated spec with long descriptions and a
+    # document made of one big literal block scalar.
+    docs = (
+        ('spec', make_spec(args.size_mb)),
+        ('prose', 'doc: |\n' + '  Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n'
+         * int(args.size_mb * 1024 * 1024 / 60)),
+    )
+    print('scalars: yaml.scan over scalar-heavy documents')
+    for label, text in docs:
+        def scan():
+            for _ in yaml.scan(text):
+                pass
+
+        elapsed = timed(scan, args.repeat)
+        size_mb = len(text) / 1e6
+        print(f'  {label:<6} {size_mb:6.1f} MB  {elapsed:8.3f}s  {size_mb / elapsed:6.2f} MB/s')
+
+
+def bench_nested(args) -> None:
+    # Every open '[' is a possible simple key until the end of its line, so
+    # the scanner tracks one key per nesting level while it scans each
+    # element.
+    depth, count = args.depth, args.count
+    items = ',\n'.join('[' * (depth - 1) + f'item{n}' + ']' * (depth - 1) for n in range(count))
+    text = '[' + items + ']\n'
+    print(f'nested: {count}-element flow sequence nested {depth} levels deep')
+
+    def scan():
+        for _ in yaml.scan(text):
+            pass
+
+    tokens = sum(1 for _ in yaml.scan(text))
+    elapsed = timed(scan, args.repeat)
+    print(f'  {tokens} tokens  {elapsed:8.3f}s  {tokens / elapsed:10.0f} tokens/s')
+
+
+def bench_tokens(args) -> None:
+    text = make_config(args.size_mb)
+    print(f'tokens: yaml.scan over a {len(text) / 1e6:.1f} MB config-style document')
+
+    def scan():
+        for _ in yaml.scan(text):
+            pass
+
+    tokens = sum(1 for _ in yaml.scan(text))
+    elapsed = timed(scan, args.repeat)
+    print(f'  {tokens} tokens  {elapsed:8.3f}s  {tokens / elapsed:10.0f} tokens/s')
+
+
+def bench_events(args) -> None:
+    text = make_spec(args.size_mb)
+    size_mb = len(text) / 1e6
+    print(f'events: yaml.parse and yaml.safe_load over a {size_mb:.1f} MB spec')
+
+    def parse():
+        for _ in yaml.parse(text):
+            pass
+
+    events = sum(1 for _ in yaml.parse(text))
+    elapsed = timed(parse, args.repeat)
+    print(f'  parse      {elapsed:8.3f}s  {events / elapsed:10.0f} events/s')
+    elapsed = timed(lambda: yaml.safe_load(text), args.repeat)
+    print(f'  safe_load  {elapsed:8.3f}s  {size_mb / elapsed:6.2f} MB/s')
+
+
+def bench_query(args) -> None:
+    # The endpoint index of generate_plaid_md.py needs a few fields of each
+    # operation; yaml.iter_paths and the include/exclude projections of
+    # yaml.safe_load construct only what is selected.
+    text = make_spec(args.size_mb)
+    size_mb = len(text) / 1e6
+    fields = ('tags', 'summary', 'operationId', 'deprecated')
+    selectors = [['info', 'version']] + [['paths', '*', '*', field] for field in fields]
+    print(f'query: yaml.safe_load, yaml.iter_paths and projections over a {size_mb:.1f} MB spec')
+
+    def select():
+        for _ in yaml.iter_paths(text, selectors):
+            pass
+
+    include = [['info'], ['paths', '*', '*', 'operationId']]
+    exclude = [['paths', '*', '*', 'description'], ['paths', '*', '*', 'responses']]
+    for label, fn in (('safe_load', lambda: yaml.safe_load(text)),
+                      ('iter_paths', select),
+                      ('include', lambda: yaml.safe_load(text, include=include)),
+                      ('exclude', lambda: yaml.safe_load(text, exclude=exclude))):
+        elapsed = timed(fn, args.repeat)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'  {label:<10} {elapsed:8.3f}s  {size_mb / elapsed:6.2f} MB/s  peak {peak / 1e6:7.1f} MB')
+
+
+def bench_resolve(args) -> None:
+    # Every plain scalar is matched against the implicit resolvers for its
+    # first character: numbers are tried as floats, ints and timestamps,
+    # while most words have no resolvers at all. Specs repeat the same
+    # scalars, which the resolver classes keep in an LRU cache.
+    count = int(args.size_mb * 1024 * 1024 / 12)
+    docs = (
+        ('numeric', '[' + ', '.join(f'{n * 7919 % 100003}, {n / 7:.4f}' for n in range(count // 2)) + ']\n'),
+        ('string', '[' + ', '.join(f'word{n % 997}' if n % 3 else f'note {n}' for n in range(count)) + ']\n'),
+        ('spec', make_spec(args.size_mb)),
+    )
+    print('resolve: implicit tag resolution over numeric-heavy, string-heavy and spec documents')
+    loader = yaml.SafeLoader('')
+    for label, text in docs:
+        values = [event.value for event in yaml.parse(text)
+                  if isinstance(event, yaml.ScalarEvent) and event.implicit[0]]
+
+        def resolve():
+            for value in values:
+                loader.resolve(yaml.ScalarNode, value, (True, False))
+
+        t_resolve = timed(resolve, args.repeat)
+        before = yaml.SafeLoader.resolve_cache_info()
+        t_load = timed(lambda: yaml.safe_load(text), args.repeat)
+        after = yaml.SafeLoader.resolve_cache_info()
+        hits, misses = after.hits - before.hits, after.misses - before.misses
+        print(f'  {label:<8} {len(values)} scalars  resolve {t_resolve:7.3f}s  '
+              f'{len(values) / t_resolve:10.0f} scalars/s  safe_load {t_load:7.3f}s  '
+              f'cache hits {hits / max(1, hits + misses):6.1%}')
+
+
+def bench_paths(args) -> None:
+    # Path resolvers are matched against every node on the way down; most
+    # of the registered paths stop matching after a step or two.
+    text = make_config(args.size_mb)
+    print(f'paths: yaml.load with path resolvers over a {len(text) / 1e6:.1f} MB config-style document')
+    for count in args.path_counts:
+        class PathLoader(yaml.SafeLoader):
+            pass
+
+        PathLoader.add_path_resolver('!image', [None, 'image'], str)
+        for n in range(1, count):
+            PathLoader.add_path_resolver(f'!field{n}', [None, f'field{n}', (list, n % 3)], str)
+        PathLoader.add_constructor('!image', PathLoader.construct_yaml_str)
+        elapsed = timed(lambda: yaml.load(text, PathLoader), args.repeat)
+        print(f'  {count:4d} paths  {elapsed:8.3f}s')
+
+
+def bench_dispatch(args) -> None:
+    # Tags that are not registered exactly are matched against the prefixes
+    # of every multi constructor; the loader class keeps the constructor
+    # found for each tag.
+    count = int(args.size_mb * 1024 * 1024 / 24)
+    print('dispatch: yaml.load of tagged scalars with many multi constructors')
+    for prefixes in args.path_counts:
+        class TagLoader(yaml.SafeLoader):
+            pass
+
+        for n in range(prefixes):
+            TagLoader.add_multi_constructor(f'!ns{n}:', lambda loader, suffix, node: suffix)
+        text = '[' + ', '.join(f'!ns{n % prefixes}:kind{n % 7} v{n}' for n in range(count)) + ']\n'
+        node = yaml.compose(text, TagLoader)
+        t_load = timed(lambda: yaml.load(text, TagLoader), args.repeat)
+        t_construct = timed(lambda: TagLoader('').construct_document(node), args.repeat)
+        print(f'  {prefixes:4d} prefixes  {count} nodes  load {t_load:8.3f}s  construct {t_construct:8.4f}s')
+
+
+def bench_numeric(args) -> None:
+    # Long int and float series: NumericSafeLoader builds each one as a
+    # single array instead of a list of boxed numbers.
+    count = int(args.size_mb * 1024 * 1024 / 8)
+    rows = max(1, count // 1000)
+    text = ''.join(f'series{r}:\n  ints: [{", ".join(str(r * 7919 + n * 13 - 500) for n in range(500))}]\n'
+                   f'  floats: [{", ".join(f"{(r + n) * 0.37:.3f}" for n in range(500))}]\n'
+                   for r in range(rows))
+    print(f'numeric: {rows * 2} sequences of 500 numbers, {len(text) / 1e6:.1f} MB')
+    for label, loader in (('SafeLoader', yaml.SafeLoader), ('NumericSafeLoader', yaml.NumericSafeLoader)):
+        elapsed = timed(lambda: yaml.load(text, loader), args.repeat)
+        tracemalloc.start()
+        data = yaml.load(text, loader)
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del data
+        print(f'  {label:<18} {elapsed:8.3f}s  retained {retained / 1e6:7.1f} MB')
+
+
+def bench_constructors(args) -> None:
+    # The int, float and timestamp constructors convert the common forms
+    # with int(), float() and fromisoformat(), and the rest with the
+    # general conversion they used for every value; both must give the
+    # same objects.
+    samples = {
+        'int': ('int', 'convert_yaml_int',
+                ['0', '7', '-42', '+1000', '123456789012345678901234567890',
+                 '0x1f', '0b101', '017', '1_000', '-190:20:30']),
+        'float': ('float', 'convert_yaml_float',
+                  ['3.14', '-0.0', '.5', '1.', '6.8523015e+5', '1.5E-3', '1e999',
+                   '1_000.5', '.inf', '-.Inf', '.nan', '190:20:30.15']),
+        'timestamp': ('timestamp', 'convert_yaml_timestamp',
+                      ['2001-12-14', '2001-12-14T21:59:43', '2001-12-14t21:59:43.100',
+                       '2001-12-14 21:59:43.123456Z', '2001-12-14T21:59:43-05:00',
+                       '2002-12-14', '2001-1-2', '2001-12-14 1:59:43.10 -5',
+                       '2001-12-14T21:59:43.1234567+05:30']),
+    }
+    count = int(args.size_mb * 1024 * 1024 / 16)
+    loader = yaml.SafeLoader('')
+    print('constructors: fast and general conversion of scalars per type')
+    for kind, (tag, convert, values) in samples.items():
+        constructor = loader.yaml_constructors[f'tag:yaml.org,2002:{tag}']
+        convert = getattr(loader, convert)
+        nodes = [yaml.ScalarNode(f'tag:yaml.org,2002:{tag}', value) for value in values]
+        for node in nodes:
+            fast, general = constructor(loader, node), convert(node.value)
+            if (type(fast), repr(fast)) != (type(general), repr(general)):
+                raise SystemExit(f'{kind} {node.value!r}: {fast!r} != {general!r}')
+        for label, selected in (('fast', nodes[:5]), ('general', nodes[5:])):
+            batch = (selected * (count // len(selected) + 1))[:count]
+            t_fast = timed(lambda: [constructor(loader, node) for node in batch], args.repeat)
+            t_general = timed(lambda: [convert(loader.construct_scalar(node)) for node in batch],
+                              args.repeat)
+            print(f'  {kind:<9} {label:<7} {count} scalars  constructor {t_fast:8.4f}s  '
+                  f'general {t_general:8.4f}s')
+    print(f'  results identical for {sum(len(v[2]) for v in samples.values())} samples')
+
+
+def bench_collections(args) -> None:
+    # Composed documents are constructed by the node constructors, which
+    # fill plain mappings and sequences in place instead of through one
+    # postponed generator per collection.
+    count = int(args.size_mb * 1024 * 1024 / 40)
+    docs = (
+        ('records', '- ' + '\n- '.join(f'{{id: {n}, tags: [a, b], meta: {{k: v{n % 10}}}}}'
+                                        for n in range(count)) + '\n'),
+        ('spec', make_spec(args.size_mb)),
+    )
+    print('collections: construct_document over composed mapping-heavy documents')
+    for label, text in docs:
+        node = yaml.compose(text)
+        for loader in (yaml.SafeLoader, yaml.FullLoader):
+            elapsed = timed(lambda: loader('').construct_document(node), args.repeat)
+            print(f'  {label:<8} {loader.__name__:<11} {elapsed:8.4f}s')
+
+
+def bench_intern(args) -> None:
+    # Loaders with intern_keys and intern_scalars set share one string
+    # object among the equal keys and short scalars of a load.
+    text = make_spec(args.size_mb)
+
+    class KeyLoader(yaml.SafeLoader):
+        intern_keys = True
+
+    class InternLoader(yaml.SafeLoader):
+        intern_keys = True
+        intern_scalars = 64
+
+    print(f'intern: yaml.load of a {len(text) / 1e6:.1f} MB generated spec')
+    for loader_class in (yaml.SafeLoader, KeyLoader, InternLoader):
+        def load():
+            loader = loader_class(text)
+            try:
+                return loader.get_single_data(), loader.intern_info()
+            finally:
+                loader.dispose()
+
+        load()
+        elapsed = timed(load, args.repeat)
+        gc.collect()
+        tracemalloc.start()
+        data, info = load()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del data
+        print(f'  {loader_class.__name__:<12} {elapsed:8.3f}s  retained {retained / 1e6:6.1f} MB  '
+              f'{info.strings} strings  {info.duplicates} duplicates  saved {info.saved / 1e6:5.1f} MB')
+
+
+def bench_shared(args) -> None:
+    # A loader with share_subtrees set composes equal subtrees of a document
+    # as one node, and so constructs them as one object.
+    text = make_spec(args.size_mb)
+
+    class SharedLoader(yaml.SafeLoader):
+        share_subtrees = True
+
+    print(f'shared: yaml.compose and yaml.load of a {len(text) / 1e6:.1f} MB generated spec')
+    for loader_class in (yaml.SafeLoader, SharedLoader):
+        for label, method in (('compose', 'get_single_node'), ('load', 'get_single_data')):
+            def load():
+                loader = loader_class(text)
+                try:
+                    return getattr(loader, method)(), loader.share_info()
+                finally:
+                    loader.dispose()
+
+            load()
+            elapsed = timed(load, args.repeat)
+            gc.collect()
+            tracemalloc.start()
+            data, info = load()
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del data
+            print(f'  {loader_class.__name__:<12} {label:<8} {elapsed:8.3f}s  retained {retained / 1e6:6.1f} MB  '
+                  f'{info.subtrees} subtrees  {info.shared} shared  {info.nodes} nodes')
+
+
+def bench_deep(args) -> None:
+    # Deeply nested collections: the composer and the constructors keep the
+    # open collections on explicit stacks, so the depth is not limited by
+    # the recursion limit.
+    print('deep: yaml.compose and yaml.safe_load over deeply nested documents')
+    for depth in args.depths:
+        docs = (
+            ('flow seq', '[' * depth + 'x' + ']' * depth),
+            ('flow map', '{a: ' * depth + 'x' + '}' * depth),
+            ('block seq', '- ' * depth + 'x\n'),
+        )
+        for label, text in docs:
+            t_compose = timed(lambda: yaml.compose(text), args.repeat)
+            t_load = timed(lambda: yaml.safe_load(text), args.repeat)
+            print(f'  {label:<9} depth {depth:<6}  compose {t_compose:8.4f}s  safe_load {t_load:8.4f}s')
+
+
+BENCHMARKS = {
+    'collections': bench_collections,
+    'constructors': bench_constructors,
+    'deep': bench_deep,
+    'dispatch': bench_dispatch,
+    'events': bench_events,
+    'intern': bench_intern,
+    'marks': bench_marks,
+    'memory': bench_memory,
+    'mmap': bench_mmap,
+    'nested': bench_nested,
+    'numeric': bench_numeric,
+    'parallel': bench_parallel,
+    'paths': bench_paths,
+    'query': bench_query,
+    'resolve': bench_resolve,
+    'scalars': bench_scalars,
+    'scaling': bench_scaling,
+    'shared': bench_shared,
+    'tokens': bench_tokens,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the vendored PyYAML loader')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS) + ['all'])
+    parser.add_argument('--size-mb', type=float, default=4.0, help='size of generated inputs (default: 4)')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 10, 100],
+                        help='input sizes in MB for the scaling and memory benchmarks (default: 1 10 100)')
+    parser.add_argument('--depth', type=int, default=50, help='nesting depth for the nested benchmark (default: 50)')
+    parser.add_argument('--depths', type=int, nargs='+', default=[10, 1000, 100000],
+                        help='nesting depths for the deep benchmark (default: 10 1000 100000)')
+    parser.add_argument('--path-counts', type=int, nargs='+', default=[1, 10, 100],
+                        help='path resolver and multi constructor counts for the paths and dispatch benchmarks '
+                             '(default: 1 10 100)')
+    parser.add_argument('--count', type=int, default=10000,
+                        help='flow sequence length for the nested benchmark (default: 10000)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8],
+                        help='process counts for the parallel benchmark (default: 2 4 8)')
+    parser.add_argument('--repeat', type=int, default=3, help='best-of repetitions (default: 3)')
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.benchmark == 'all' else [args.benchmark]
+    for name in names:
+        BENCHMARKS[name](args)
+
+
+if __name__ == '__main__':
+    main()
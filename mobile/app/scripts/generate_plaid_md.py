@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import pathlib
 import sys
 import re
 from collections import defaultdict
@@ -57,6 +58,19 @@ def slugify(text: str) -> str:
     return text.strip().lower().replace(' ', '-')
 
 
+# The fields of an operation that generate_all_endpoints_md reads.
+OPERATION_FIELDS = ('tags', 'summary', 'operationId', 'deprecated')
+
+
+def load_spec_index(spec_path: str) -> dict:
+    # Load only the parts of the (large) spec that the endpoint index reads
+    # instead of all of it. Every operation is kept, as an empty mapping if
+    # it has none of these fields, so that it is still listed (as Untagged).
+    include = [['info', 'version']] + [['paths', '*', '*', field] for field in OPERATION_FIELDS]
+    # A path lets the loader memory-map the spec instead of reading it in small chunks.
+    return yaml.safe_load(pathlib.Path(spec_path), include=include)
+
+
 def generate_all_endpoints_md(spec: dict) -> str:
     title = '# Plaid API — Complete Endpoint Index\n'
     version = spec.get('info', {}).get('version', 'unknown')
@@ -201,8 +215,7 @@ def generate_e2e_flows_md() -> str:
 def main():
     os.makedirs(DOCS_DIR, exist_ok=True)
     spec_path = find_spec_file()
-    with open(spec_path, 'r', encoding='utf-8') as f:
-        spec = yaml.safe_load(f)
+    spec = load_spec_index(spec_path)
 
     all_md = generate_all_endpoints_md(spec)
     with open(os.path.join(DOCS_DIR, 'plaid-openapi-all.md'), 'w', encoding='utf-8') as f:
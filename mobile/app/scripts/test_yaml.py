@@ -0,0 +1,652 @@
+"""
+Regression tests for the vendored pure-Python PyYAML in ./.tools.
+
+  python -m pytest -q test_yaml.py
+"""
+import array
+import asyncio
+import os
+import pickle
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.tools')))
+import yaml  # noqa: E402
+import yaml.parallel  # noqa: E402
+from yaml.constructor import SafeConstructor  # noqa: E402
+from yaml.reader import Reader  # noqa: E402
+from yaml.incremental import IncrementalParser  # noqa: E402
+
+import generate_plaid_md  # noqa: E402
+
+
+def tagged(prefix):
+    def construct(loader, node):
+        return prefix + loader.construct_scalar(node)
+    return construct
+
+
+@pytest.fixture
+def safe_constructors():
+    """Restore the constructors of SafeConstructor after a test changes them."""
+    saved = SafeConstructor.yaml_constructors.copy()
+    yield SafeConstructor.yaml_constructors
+    SafeConstructor.yaml_constructors.clear()
+    SafeConstructor.yaml_constructors.update(saved)
+    SafeConstructor.yaml_constructor_cache = None
+
+
+def test_safe_load_uses_constructors_added_in_place(safe_constructors):
+    SafeConstructor.add_constructor('tag:yaml.org,2002:str', tagged('STR:'))
+    SafeConstructor.add_constructor('tag:yaml.org,2002:int', tagged('INT:'))
+    SafeConstructor.add_constructor('tag:yaml.org,2002:bool', tagged('BOOL:'))
+    assert yaml.safe_load('a: 1\nb: [2, yes, x]\n') == \
+        {'STR:a': 'INT:1', 'STR:b': ['INT:2', 'BOOL:yes', 'STR:x']}
+
+
+def test_safe_load_uses_constructors_changed_directly(safe_constructors):
+    safe_constructors['tag:yaml.org,2002:float'] = tagged('FLOAT:')
+    safe_constructors['tag:yaml.org,2002:timestamp'] = tagged('TS:')
+    assert yaml.safe_load('[1.5, 2001-12-14]') == ['FLOAT:1.5', 'TS:2001-12-14']
+    assert list(yaml.safe_load_all('1.5\n--- 2.5\n')) == ['FLOAT:1.5', 'FLOAT:2.5']
+
+
+def test_numeric_arrays_use_constructors_added_in_place(safe_constructors):
+    SafeConstructor.add_constructor('tag:yaml.org,2002:int', tagged('INT:'))
+    assert yaml.load('[1, 2]', Loader=yaml.NumericSafeLoader) == ['INT:1', 'INT:2']
+
+
+def event_values(events):
+    return [(type(event).__name__, getattr(event, 'value', None)) for event in events]
+
+
+@pytest.mark.parametrize('text', [
+    'a: ' + 'x' * 150000 + '\nb: 1\n...\n',
+    'a: |\n' + '  line\n' * 20000 + 'b: "' + 'q \\" ' * 20000 + '"\n...\n',
+    '- [' + '{k: v}, ' * 20000 + "'x']\n- 'it''s'\n...\n",
+])
+@pytest.mark.parametrize('size', [100000, 4096, 61])
+def test_incremental_parser_decides_complete_document_without_close(text, size):
+    parser = IncrementalParser()
+    events = []
+    for start in range(0, len(text), size):
+        parser.feed(text[start:start + size])
+        events.extend(parser.events())
+    assert event_values(events) == event_values(yaml.parse(text))[:-1]
+
+
+class QueueStream:
+    """A stream whose `read` waits for the data put into its queue."""
+
+    def __init__(self, *data):
+        self.queue = asyncio.Queue()
+        for chunk in data:
+            self.queue.put_nowait(chunk)
+
+    async def read(self, size):
+        return await self.queue.get()
+
+
+def test_aparse_yields_document_before_more_data():
+    async def run():
+        stream = QueueStream('a: ' + 'x' * 150000, '\nb: 1\n...\n')
+        events = yaml.aparse(stream)
+        while True:
+            event = await asyncio.wait_for(events.__anext__(), 5)
+            if isinstance(event, yaml.DocumentEndEvent):
+                break
+        stream.queue.put_nowait('')
+        assert [type(event) async for event in events] == [yaml.StreamEndEvent]
+    asyncio.run(run())
+
+
+def test_aload_all_yields_document_before_more_data():
+    async def run():
+        stream = QueueStream('a: ' + 'x' * 150000, '\nb: 1\n...\n')
+        documents = yaml.aload_all(stream)
+        document = await asyncio.wait_for(documents.__anext__(), 5)
+        assert document == {'a': 'x' * 150000, 'b': 1}
+        stream.queue.put_nowait('--- 2\n')
+        stream.queue.put_nowait('')
+        assert [document async for document in documents] == [2]
+    asyncio.run(run())
+
+
+def test_implicit_resolver_with_flags_other_than_verbose():
+    class Loader(yaml.SafeLoader):
+        pass
+    Loader.add_implicit_resolver('!ci', re.compile('^hello$', re.I), list('hH'))
+    Loader.add_implicit_resolver('!after', re.compile('^h'), list('hH'))
+    loader = Loader('')
+    assert [loader.resolve(yaml.ScalarNode, value, (True, False))
+            for value in ['hello', 'HeLLo', 'hi', 'yes']] == \
+        ['!ci', '!ci', '!after', 'tag:yaml.org,2002:bool']
+
+
+def test_endpoint_index_lists_operations_without_index_fields(tmp_path):
+    text = ('info: {version: "1"}\n'
+            'paths:\n'
+            '  /a: {post: {tags: [A], summary: s, responses: {}}}\n'
+            '  /b: {get: {responses: {}}}\n')
+    spec_path = tmp_path / 'openapi.yaml'
+    spec_path.write_text(text)
+    generate = generate_plaid_md.generate_all_endpoints_md
+    index = generate(generate_plaid_md.load_spec_index(str(spec_path)))
+    assert index == generate(yaml.safe_load(text))
+    assert '## Untagged\n\n- GET `/b`:' in index
+
+
+SharedLoader = yaml.loader_class(yaml.SafeLoader, share_subtrees=True)
+
+
+def test_shared_subtrees_count_each_saved_node_once():
+    loader = SharedLoader('- {x: 1}\n- {x: 1}\n- [a, [b, c]]\n- [a, [b, c]]\n- [b, c]\n')
+    try:
+        loader.get_single_node()
+        assert loader.share_info() == (9, 3, 11)
+    finally:
+        loader.dispose()
+
+
+@pytest.mark.parametrize('text, info', [
+    ('- [[a, b], [a, b]]\n- [[a, b], [a, b]]\n- [a, b]\n', (5, 3, 13)),
+    ('[[[1]], [[1]], [[[1]]]]', (5, 2, 6)),
+    ('- &a [1]\n- [1]\n- &b [1]\n- *a\n', (3, 2, 2)),
+])
+def test_shared_subtrees_count_nested_duplicates(text, info):
+    loader = SharedLoader(text)
+    try:
+        loader.get_single_node()
+        assert loader.share_info() == info
+    finally:
+        loader.dispose()
+
+
+def test_share_subtrees_option():
+    text = '- {x: [1, 2]}\n- {x: [1, 2]}\n- [1, 2]\n'
+    data = yaml.safe_load(text, share_subtrees=True)
+    assert data == yaml.safe_load(text)
+    assert data[0] is data[1]
+    assert data[2] is data[0]['x']
+    data = yaml.safe_load(text)
+    assert data[0] is not data[1]
+    node = yaml.compose(text, yaml.SafeLoader, share_subtrees=True)
+    assert node.value[0] is node.value[1]
+    assert node.value[2] is node.value[0].value[0][1]
+    first, second = yaml.compose_all('[[2]]\n--- [[2], [2]]\n', share_subtrees=True)
+    assert second.value[0] is second.value[1]
+    assert first.value[0] is not second.value[0]
+
+
+def test_share_subtrees_keeps_anchored_nodes():
+    text = '- &a {x: [1]}\n- {x: [1]}\n- &b {x: [1]}\n- *a\n- {x: [1]}\n'
+    data = yaml.safe_load(text, share_subtrees=True)
+    assert [id(item) for item in data] == \
+        [id(data[0]), id(data[1]), id(data[2]), id(data[0]), id(data[1])]
+    assert len({id(data[0]), id(data[1]), id(data[2])}) == 3
+    assert data[0]['x'] is data[1]['x'] is data[2]['x']
+
+
+@pytest.mark.parametrize('text', [
+    '- {=: 1}\n- =\n',
+    '- {=: a, x: {=: b}}\n- {x: {=: b}}\n- {=: a, x: {=: b}}\n',
+    '- {<<: {a: 1}, b: 2}\n- {<<: {a: 1}, b: 2}\n- {a: 1}\n',
+    '- {a: 1}\n- {<<: [{a: 1}, {<<: {c: 3}}], b: 2}\n- {<<: {c: 3}}\n- {<<: [{a: 1}, {<<: {c: 3}}], b: 2}\n',
+])
+def test_shared_subtrees_with_merge_and_value_keys(text):
+    def load(Loader):
+        try:
+            return yaml.load(text, Loader=Loader)
+        except yaml.YAMLError as exc:
+            return type(exc)
+    assert load(SharedLoader) == load(yaml.SafeLoader)
+
+
+@pytest.fixture
+def mapped_files(monkeypatch):
+    """Record the files a Reader maps, read in small windows."""
+    mapped = []
+
+    def map_file(reader, path):
+        view = map_file.original(reader, path)
+        mapped.append(view.obj)
+        return view
+    map_file.original = Reader.map_file
+    monkeypatch.setattr(Reader, 'map_file', map_file)
+    monkeypatch.setattr(Reader, 'MMAP_WINDOW', 4096)
+    return mapped
+
+
+def test_dispose_unmaps_file(tmp_path, mapped_files):
+    path = tmp_path / 'data.yaml'
+    path.write_text('- x\n' * 10000)
+    loader = yaml.SafeLoader(path)
+    assert loader.get_token() is not None
+    loader.dispose()
+    assert mapped_files[0].closed
+
+
+@pytest.mark.parametrize('data', [
+    b'a: [1\n' + b'- x\n' * 10000,
+    b'a: \xff' + b'- x\n' * 10000,
+])
+def test_load_error_unmaps_file(tmp_path, mapped_files, data):
+    path = tmp_path / 'data.yaml'
+    path.write_bytes(data)
+    with pytest.raises(yaml.YAMLError):
+        yaml.safe_load(path)
+    assert mapped_files[0].closed
+
+
+@pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_slotted_objects(protocol):
+    text = '%YAML 1.1\n--- !t\na: &x [1, {b: c}]\nd: *x\n'
+    node = pickle.loads(pickle.dumps(yaml.compose(text), protocol))
+    assert yaml.serialize(node) == yaml.serialize(yaml.compose(text))
+    for objects in [list(yaml.scan(text)), list(yaml.parse(text))]:
+        copies = pickle.loads(pickle.dumps(objects, protocol))
+        assert [repr(copy) for copy in copies] == [repr(obj) for obj in objects]
+    loader = yaml.SafeLoader(text)
+    loader.get_token()
+    marks = [loader.get_mark(), yaml.Mark('<file>', 3, 1, 0, None, None)]
+    for mark in marks:
+        copy = pickle.loads(pickle.dumps(mark, protocol))
+        assert type(copy) is type(mark)
+        assert str(copy) == str(mark)
+        assert (copy.index, copy.line, copy.column) == (mark.index, mark.line, mark.column)
+
+
+class PathLoader(yaml.SafeLoader):
+    pass
+
+
+PathLoader.add_path_resolver('!x', ['a'], str)
+PathLoader.add_path_resolver('!x', [], str)
+PathLoader.add_path_resolver('!x', ['c', 1], str)
+PathLoader.add_path_resolver('!x', [(dict, 'd'), (list, None)], str)
+PathLoader.add_constructor('!x', lambda loader, node: ('X', loader.construct_scalar(node)))
+
+PATH_TEXT = 'a: b\nc: [b, b, &y b]\nd: [b, {a: b}, *y]\ne: b\n'
+
+
+@pytest.mark.parametrize('path', [['a'], ['c', 1], ['c', '*'], ['d', '*'], ['d', 1, 'a'], ['*']])
+def test_iter_path_resolves_path_resolver_tags_as_load(path):
+    def select(data, path, keys=()):
+        if not path:
+            yield keys, data
+            return
+        items = data.items() if isinstance(data, dict) else enumerate(data)
+        for key, value in items:
+            if path[0] in ('*', key):
+                yield from select(value, path[1:], keys + (key,))
+    expected = list(select(yaml.load(PATH_TEXT, PathLoader), path))
+    assert list(yaml.iter_path(PATH_TEXT, path, Loader=PathLoader)) == expected
+
+
+@pytest.mark.parametrize('include, exclude, expected', [
+    (None, [['e']], lambda data: {key: data[key] for key in 'acd'}),
+    ([['a'], ['c', 1]], [], lambda data: {'a': data['a'], 'c': [data['c'][1]]}),
+    ([['d']], [['d', 0]], lambda data: {'d': data['d'][1:]}),
+    ([['*', 2]], [], lambda data: {'c': data['c'][2:], 'd': data['d'][2:]}),
+    ([['d', 1, 'a'], ['e']], [], lambda data: {'d': [data['d'][1]], 'e': data['e']}),
+])
+def test_load_projection_resolves_path_resolver_tags_as_load(include, exclude, expected):
+    projected = yaml.load_projection(PATH_TEXT, PathLoader, include, exclude)
+    assert projected == expected(yaml.load(PATH_TEXT, PathLoader))
+
+
+def test_paths_match_keys_of_the_same_type():
+    assert yaml.load_projection('{1: a, 2: b}', include=[[True]]) == {}
+    assert yaml.load_projection('{true: a, 2: b}', include=[[1]]) == {}
+    assert yaml.load_projection('{0: a, 2: b}', exclude=[[False]]) == {0: 'a', 2: 'b'}
+    assert yaml.load_projection('[x, [y, z]]', include=[[1, 0]]) == [['y']]
+    assert yaml.load_projection('[x, [y, z]]', include=[[True, False]]) == []
+    assert list(yaml.iter_path('{1.0: a, 1: b}', [1])) == [((1,), 'b')]
+    assert list(yaml.iter_path('[x, y]', [True])) == []
+
+
+class ArrayLoader(yaml.NumericSafeLoader):
+    numeric_array_numpy = False
+
+
+class ComposedArrayLoader(ArrayLoader):
+    pass
+
+
+# A constructor of its own makes the loader compose the nodes first.
+ComposedArrayLoader.add_constructor('!unused', SafeConstructor.construct_yaml_str)
+
+
+@pytest.mark.parametrize('Loader', [ArrayLoader, ComposedArrayLoader])
+@pytest.mark.parametrize('text, typecode, values', [
+    ('[1, -2, 0x1f, 1_000, 017]', 'q', [1, -2, 31, 1000, 15]),
+    ('[1.5, -2.0e+3, .inf]', 'd', [1.5, -2000.0, float('inf')]),
+    ('[1, 2.5, -3]', 'd', [1.0, 2.5, -3.0]),
+    ('[1, !!float 2, 9007199254740992, 0.5]', 'd', [1.0, 2.0, 2.0**53, 0.5]),
+    ('[9223372036854775807, -9223372036854775808]', 'q', [2**63 - 1, -2**63]),
+    ('[1, 9223372036854775808]', None, [1, 2**63]),
+    ('[1.5, 9007199254740993]', None, [1.5, 2**53 + 1]),
+    ('[1, x]', None, [1, 'x']),
+    ('[1.5, "2"]', None, [1.5, '2']),
+    ('[1, {a: 2}]', None, [1, {'a': 2}]),
+])
+def test_numeric_arrays(Loader, text, typecode, values):
+    data = yaml.load(text, Loader)
+    if typecode is None:
+        assert type(data) is list
+        assert [(type(item), item) for item in data] == \
+            [(type(value), value) for value in values]
+    else:
+        assert (type(data), data.typecode) == (array.array, typecode)
+        assert data.tolist() == values
+
+
+@pytest.mark.parametrize('Loader', [ArrayLoader, ComposedArrayLoader])
+def test_numeric_arrays_with_anchors(Loader):
+    data = yaml.load('- &a [1, 2]\n- *a\n- [&n 3, *n, 4.5]\n- &m [*n, 1e3]\n- *m\n', Loader)
+    assert [(item.typecode, item.tolist()) if type(item) is array.array else item
+            for item in data] == \
+        [('q', [1, 2]), ('q', [1, 2]), ('d', [3.0, 3.0, 4.5]), [3, '1e3'], [3, '1e3']]
+    assert data[0] is data[1]
+    assert data[3] is data[4]
+
+
+@pytest.mark.parametrize('kind, value', [
+    ('int', value) for value in
+    ['0', '-0', '+1', '17', '-17', '1_000', '017', '0o17', '0x1f', '-0x1F',
+     '0b101', '190:20:30', '-1:30', '12345678901234567890']
+] + [
+    ('float', value) for value in
+    ['1.5', '-0.0', '+1.0', '1e3', '1.e3', '-.5E-2', '1_000.5', '190:20:30.15',
+     '.inf', '-.Inf', '+.INF', '.nan', '.NaN', '1' * 400 + '.0']
+] + [
+    ('timestamp', value) for value in
+    ['2001-12-14', '2002-1-2', '2001-12-14t21:59:43.10-05:00',
+     '2001-12-14 21:59:43.10 -5', '2001-12-15T02:59:43.1Z', '2001-12-15T02:59:43Z',
+     '2001-12-15T02:59:43.100Z', '2001-12-15T02:59:43.123456+01:30',
+     '2001-12-15 02:59:43.1234567', '2001-12-15 2:59:43', '2001-12-15T02:59:43.000-00:00']
+])
+def test_fast_path_constructors_match_the_converters(kind, value):
+    def same(data):
+        return type(data), repr(data), getattr(data, 'utcoffset', lambda: None)()
+    constructor = SafeConstructor()
+    tag = 'tag:yaml.org,2002:' + kind
+    node = yaml.ScalarNode(tag, value)
+    expected = same(getattr(constructor, 'convert_yaml_' + kind)(value))
+    assert same(getattr(constructor, 'construct_yaml_' + kind)(node)) == expected
+    assert same(yaml.safe_load('!!%s %s' % (kind, value))) == expected
+
+
+INTERN_TEXT = '- {name: alpha, size: 1}\n- {name: alpha, size: 2}\n- {name: ' + 'b' * 20 + ', size: 3}\n'
+
+
+@pytest.mark.parametrize('include', [None, [['*', 'name']]])
+def test_safe_load_interns_keys_and_scalars(include):
+    data = yaml.safe_load(INTERN_TEXT, include=include)
+    assert len({id(key) for item in data for key in item}) == 3 * len(data[0])
+    assert data[0]['name'] is not data[1]['name']
+    data = yaml.safe_load(INTERN_TEXT, include=include, intern_keys=True)
+    assert len({id(key) for item in data for key in item}) == len(data[0])
+    assert data[0]['name'] is not data[1]['name']
+    data = yaml.safe_load(INTERN_TEXT, include=include, intern_scalars=8)
+    assert data[0]['name'] is data[1]['name']
+    assert yaml.safe_load(INTERN_TEXT, include=include, intern_keys=True,
+                          intern_scalars=8) == yaml.safe_load(INTERN_TEXT, include=include)
+
+
+@pytest.mark.parametrize('Loader', [yaml.SafeLoader, ComposedArrayLoader])
+def test_intern_info(Loader):
+    def info(**options):
+        loader = yaml.loader_class(Loader, **options)(INTERN_TEXT)
+        try:
+            data = loader.get_single_data()
+            return data, loader.intern_info()
+        finally:
+            loader.dispose()
+    data, interned = info(intern_keys=True)
+    assert interned == (2, 4, 4 * sys.getsizeof('name'))
+    assert data[1]['name'] is not data[0]['name']
+    data, interned = info(intern_keys=True, intern_scalars=8)
+    assert interned == (3, 5, 4 * sys.getsizeof('name') + sys.getsizeof('alpha'))
+    assert data[1]['name'] is data[0]['name']
+    assert data[2]['name'] is not data[0]['name']
+    assert info()[1] == (0, 0, 0)
+
+
+class TokenParser(yaml.parser.Parser):
+    """A parser of a list of tokens, without a Scanner."""
+
+    def __init__(self, tokens):
+        super().__init__()
+        self.tokens = list(tokens)
+
+    def check_token(self, *choices):
+        return bool(self.tokens) and (not choices or isinstance(self.tokens[0], choices))
+
+    def peek_token(self):
+        return self.tokens[0]
+
+    def get_token(self):
+        return self.tokens.pop(0)
+
+
+def event_details(event):
+    marks = [(mark.index, mark.line, mark.column) for mark in [event.start_mark, event.end_mark]]
+    return (type(event).__name__, marks, getattr(event, 'anchor', None),
+            getattr(event, 'tag', None), getattr(event, 'implicit', None),
+            getattr(event, 'value', None), getattr(event, 'style', None),
+            getattr(event, 'flow_style', None))
+
+
+@pytest.mark.parametrize('text', [
+    'a: b\nc: "d"\ne: \'f\'\ng:\n  h: i\n  j:\nk: [l]\n',
+    'a: b\n? c\n: d\nx: y\n',
+    '?\n: v\na: b\n?\n: w\n? x\nk: l\n',
+    ': v\n',
+    'a: b\n: w\n',
+    'a:\n  b:\n    c: d\n  e: f\ng: h\n',
+    'a: &x b\n!t c: *x\nd:\n- e\n- f: g\n  h: i\n',
+    'a: |\n  lit\nb: >\n  fold\nc: plain\n  more\n',
+    '- a: b\n  c: d\n- ? e\n  : f\n',
+])
+def test_block_mappings_parse_the_same_without_scanner(text):
+    def parse(parser):
+        events = []
+        try:
+            while parser.check_event():
+                events.append(event_details(parser.get_event()))
+        except yaml.YAMLError as exc:
+            events.append(str(exc))
+        return events
+    parser = TokenParser(yaml.scan(text, yaml.SafeLoader))
+    assert not hasattr(parser, 'scan_block_mapping_key')
+    assert parse(parser) == parse(yaml.SafeLoader(text))
+
+
+class StateLoader(yaml.SafeLoader):
+    pass
+
+
+StateLoader.add_path_resolver('!a', ['a'], str)
+StateLoader.add_path_resolver('!a-b', ['a', 'b'], str)
+StateLoader.add_path_resolver('!a-any', ['a', None], None)
+StateLoader.add_path_resolver('!a-map', [(dict, 'a')], dict)
+StateLoader.add_path_resolver('!seq-1', [(list, 1)], str)
+StateLoader.add_path_resolver('!seq-any-key', [(list, None), (dict, True)], str)
+StateLoader.add_path_resolver('!any-a-b', [None, 'a', 'b'], list)
+
+
+class UnkeptStateLoader(StateLoader):
+    # Checks the prefixes as StateLoader does, but the transitions are
+    # not kept, as for any loader that overrides the check.
+    def check_resolver_prefix(self, *args):
+        return super().check_resolver_prefix(*args)
+
+
+def node_tags(node, path=()):
+    yield path, node.tag
+    if isinstance(node, yaml.SequenceNode):
+        for index, item in enumerate(node.value):
+            yield from node_tags(item, path + (index,))
+    elif isinstance(node, yaml.MappingNode):
+        for key, value in node.value:
+            yield from node_tags(key, path + ('?' + key.value,))
+            yield from node_tags(value, path + (key.value,))
+
+
+STATE_TEXTS = [
+    'a: x\nb: y\n',
+    'a: {b: x, c: y, 1: z}\nc: {a: {b: [x]}}\n',
+    'a: [x, {b: y}]\n',
+    '- x\n- y\n- {k: v, a: {b: [w]}}\n- y\n',
+    '[a, [x, y], {a: {b: x}}, {1: x}]\n',
+    '{a: x, b: {a: y}}\n--- [{a: {b: [c]}}, {a: {b: d}}]\n---\na: {b: {c: d}}\n',
+]
+
+
+@pytest.mark.parametrize('text', STATE_TEXTS)
+def test_path_resolver_states_match_unkept_transitions(text):
+    def tags(Loader):
+        return [list(node_tags(node)) for node in yaml.compose_all(text, Loader)]
+    assert tags(StateLoader) == tags(UnkeptStateLoader)
+
+
+def test_path_resolver_states():
+    text = 'a: {b: x, c: [y]}\nc: [p, q, r]\n'
+    assert dict(node_tags(yaml.compose(text, StateLoader))) == {
+        (): 'tag:yaml.org,2002:map', ('?a',): 'tag:yaml.org,2002:str', ('a',): '!a-map',
+        ('a', '?b'): 'tag:yaml.org,2002:str', ('a', 'b'): '!a-b',
+        ('a', '?c'): 'tag:yaml.org,2002:str', ('a', 'c'): '!a-any',
+        ('a', 'c', 0): 'tag:yaml.org,2002:str',
+        ('?c',): 'tag:yaml.org,2002:str', ('c',): 'tag:yaml.org,2002:seq',
+        ('c', 0): 'tag:yaml.org,2002:str', ('c', 1): 'tag:yaml.org,2002:str',
+        ('c', 2): 'tag:yaml.org,2002:str',
+    }
+    text = '[x, y, {k: v, a: {b: [z]}}]\n'
+    assert dict(node_tags(yaml.compose(text, StateLoader))) == {
+        (): 'tag:yaml.org,2002:seq', (0,): 'tag:yaml.org,2002:str', (1,): '!seq-1',
+        (2,): 'tag:yaml.org,2002:map', (2, '?k'): '!seq-any-key',
+        (2, 'k'): 'tag:yaml.org,2002:str', (2, '?a'): '!seq-any-key',
+        (2, 'a'): 'tag:yaml.org,2002:map', (2, 'a', '?b'): 'tag:yaml.org,2002:str',
+        (2, 'a', 'b'): '!any-a-b', (2, 'a', 'b', 0): 'tag:yaml.org,2002:str',
+    }
+    assert StateLoader.compile_path_resolvers().transitions
+    assert UnkeptStateLoader.compile_path_resolvers().transitions is None
+
+
+def test_path_resolver_states_with_overridden_check():
+    class FoldLoader(StateLoader):
+        fold = False
+
+        def check_resolver_prefix(self, depth, path, kind, current_node, current_index):
+            if self.fold and isinstance(current_index, yaml.ScalarNode):
+                current_index = yaml.ScalarNode(current_index.tag, current_index.value.lower())
+            return super().check_resolver_prefix(depth, path, kind,
+                                                 current_node, current_index)
+    loader = FoldLoader('A: x\n--- {A: x}\n--- {a: x}\n')
+    try:
+        tags = []
+        while loader.check_node():
+            tags.append(loader.get_node().value[0][1].tag)
+            loader.fold = True
+    finally:
+        loader.dispose()
+    assert tags == ['tag:yaml.org,2002:str', '!a', '!a']
+
+
+@pytest.mark.parametrize('text, chunks', [
+    ('%YAML 1.1\n--- a\n...\n%TAG ! tag:yaml.org,2002:\n--- !int 1\n--- c\n',
+     ['%YAML 1.1\n--- a\n...\n', '%TAG ! tag:yaml.org,2002:\n--- !int 1\n', '--- c\n']),
+    ('a\n...\n# c\n\n%YAML 1.1\n---\nb\n', ['a\n...\n', '# c\n\n%YAML 1.1\n---\nb\n']),
+    ('--- a\n%not\n--- b\n', ['--- a\n%not\n--- b\n']),
+    ('a: |\n  ---\n  x\n--- b\n', ['a: |\n  ---\n  x\n', '--- b\n']),
+    ('- "x\n  --- y"\n--- z\n', ['- "x\n  --- y"\n', '--- z\n']),
+    ("--- 'p\n  ...\n  q'\n--- r\n", ["--- 'p\n  ...\n  q'\n", '--- r\n']),
+    ('a\n...\n--- b\n...\n', ['a\n...\n', '--- b\n...\n']),
+    ('--- a\n...\n...\n--- b\n', ['--- a\n...\n...\n', '--- b\n']),
+    ('a\n...\n', ['a\n...\n']),
+    ('a: 1\nb: 2\n', ['a: 1\nb: 2\n']),
+])
+def test_split_documents(text, chunks):
+    assert yaml.parallel.split_documents(text) == chunks
+    assert ''.join(chunks) == text
+    assert [document for chunk in chunks for document in yaml.safe_load_all(chunk)] == \
+        list(yaml.safe_load_all(text))
+
+
+PARALLEL_TEXT = ''.join(
+    '%%YAML 1.1\n---\nn: %d\ns: "x\n  --- y"\nb: |\n  ---\n  z\n...\n' % n
+    if n % 3 == 0 else '--- [%d, &a %d, *a]\n' % (n, n)
+    for n in range(40)) + '--- last\n'
+
+
+def load_documents(text, **options):
+    documents = []
+    try:
+        for document in yaml.safe_load_all(text, **options):
+            documents.append(document)
+    except yaml.YAMLError as exc:
+        documents.append(str(exc))
+    return documents
+
+
+@pytest.mark.parametrize('text', [
+    PARALLEL_TEXT,
+    PARALLEL_TEXT.replace('[20, &a 20, *a]', '[20, *b]'),
+    PARALLEL_TEXT.replace('--- [35,', '--- [35,,'),
+    PARALLEL_TEXT.replace('n: 39', 'n: 39\n- x'),
+    'a: 1\nb: 2\n',
+    '',
+], ids=['documents', 'undefined-alias', 'parser-error', 'last-chunk-error', 'single', 'empty'])
+def test_parallel_safe_load_all(text):
+    documents = load_documents(text, workers=2)
+    assert documents == load_documents(text)
+    assert len(documents) > 1 or len(yaml.parallel.split_documents(text)) < 2
+
+
+def test_add_constructor_clears_the_constructor_cache():
+    class Parent(yaml.SafeLoader):
+        pass
+
+    class Child(Parent):
+        pass
+    Parent.add_constructor('!p', tagged('P1:'))
+    Parent.add_multi_constructor('!m', lambda loader, suffix, node: 'M:' + suffix)
+    text = '[!p a, !m:x b, !m:y c]'
+    assert yaml.load(text, Parent) == ['P1:a', 'M::x', 'M::y']
+    assert yaml.load(text, Child) == ['P1:a', 'M::x', 'M::y']
+
+    Parent.add_constructor('!p', tagged('P2:'))
+    assert Parent.__dict__['yaml_constructor_cache'] is None
+    assert yaml.load(text, Parent) == ['P2:a', 'M::x', 'M::y']
+    assert yaml.load(text, Child) == ['P2:a', 'M::x', 'M::y']
+
+    Parent.add_constructor('!m:x', tagged('X:'))
+    assert yaml.load(text, Child) == ['P2:a', 'X:b', 'M::y']
+
+    Child.add_constructor('!m:y', tagged('C:'))
+    assert Child.__dict__['yaml_constructor_cache'] is None
+    assert yaml.load(text, Child) == ['P2:a', 'X:b', 'C:c']
+    assert yaml.load(text, Parent) == ['P2:a', 'X:b', 'M::y']
+
+    # Child has constructors of its own now, so it does not see those
+    # added to Parent, as with any constructors, but it still shares the
+    # multi constructors of Parent.
+    with pytest.raises(yaml.constructor.ConstructorError):
+        yaml.load('!n:z d', Child)
+    Parent.add_constructor('!p', tagged('P3:'))
+    Parent.add_multi_constructor('!n', lambda loader, suffix, node: 'N:' + suffix)
+    assert yaml.load(text, Parent) == ['P3:a', 'X:b', 'M::y']
+    assert yaml.load(text, Child) == ['P2:a', 'X:b', 'C:c']
+    assert yaml.load('!n:z d', Child) == 'N::z'
+
+
+def test_constructor_cache_size():
+    class Loader(yaml.SafeLoader):
+        yaml_constructor_cache_size = 8
+    Loader.add_multi_constructor('!t', lambda loader, suffix, node: suffix)
+    text = '[%s]' % ', '.join('!t%d x' % (n % 20) for n in range(60))
+    assert yaml.load(text, Loader) == [str(n % 20) for n in range(60)]
+    assert len(Loader.yaml_constructor_cache[2]) <= Loader.yaml_constructor_cache_size